@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import sys
+
+import django
+from django.conf import settings
+
+
+settings.configure(
+    DATABASES={
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': ':memory:',
+        }
+    },
+    INSTALLED_APPS=(
+        'django.contrib.auth',
+        'django.contrib.contenttypes',
+        'django.contrib.sessions',
+        'socialnetworks',
+        'socialnetworks.facebook',
+    ),
+    AUTHENTICATION_BACKENDS=(
+        'django.contrib.auth.backends.ModelBackend',
+        'socialnetworks.facebook.backends.FacebookBackend',
+    ),
+    SECRET_KEY='socialnetworks-tests',
+    ROOT_URLCONF='socialnetworks.tests.urls',
+    SOCIALNETWORKS_CONFIGURATION={
+        'FACEBOOK': {
+            'APP_ID': 'facebook-app-id',
+            'APP_SECRET': 'facebook-app-secret',
+        },
+    },
+)
+
+
+if __name__ == '__main__':
+    if hasattr(django, 'setup'):
+        django.setup()
+
+    from django.test.utils import get_runner
+
+    runner = get_runner(settings)()
+    failures = runner.run_tests(sys.argv[1:] or ['socialnetworks'])
+    sys.exit(bool(failures))
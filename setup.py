@@ -22,7 +22,8 @@ setup(
         'Django>=1.5',
         'requests_oauthlib',
         'unidecode',
-        'pytz'
+        'pytz',
+        'futures; python_version < "3.0"'
     ],
     extras_require={
         'security': 'requests[security]'
@@ -1,6 +1,17 @@
+import importlib
+
+from django.conf import settings
 from django.contrib.auth.backends import ModelBackend
 
 
+# The paths of the configured backends indexed by the profile model that
+# they authenticate.
+_backend_paths = {}
+
+# The profile models of the installed services indexed by their app label.
+_profile_models = {}
+
+
 class BaseSocialBackend(ModelBackend):
     """
     Base backend that handles the login with the social networks.
@@ -11,12 +22,99 @@ class BaseSocialBackend(ModelBackend):
     # The model to lookup for the user
     model = None
 
-    def authenticate(self, service_uid):
+    def authenticate(self, service_uid, service=None):
+        # Skips the lookup when the login is for another service.
+        if service is not None and service != self.model._meta.app_label:
+            return None
+
         try:
-            profile = self.model.objects.get(
+            profile = self.model.objects.select_related('user').get(
                 service_uid=service_uid)
 
             return profile.user
 
         except self.model.DoesNotExist:
             return None
+
+
+class SocialProfileBackend(ModelBackend):
+    """
+    Backend that handles the login with all the installed social networks,
+    it can replace the backends of each service.
+
+    The profile is looked up only in the model of the given service (the app
+    label of the service, ie, 'facebook') and the logins that do not provide
+    a service and its user id are skipped without querying the database.
+    """
+    supports_object_permissions = False
+    supports_anonymous_user = False
+
+    # The app labels of the services whose users can log in, None allows all
+    # the installed services.
+    services = None
+
+    def get_model(self, service):
+        """
+        Returns the profile model of the given service or None if the
+        service is not installed or allowed.
+        """
+        if self.services is not None and service not in self.services:
+            return None
+
+        return get_profile_models().get(service)
+
+    def authenticate(self, service_uid=None, service=None):
+        model = self.get_model(service)
+
+        if model is None or service_uid is None:
+            return None
+
+        try:
+            profile = model.objects.select_related('user').get(
+                service_uid=service_uid)
+
+            return profile.user
+
+        except model.DoesNotExist:
+            return None
+
+
+def get_profile_models():
+    """
+    Returns a dictionary of the profile models of the installed services
+    indexed by their app label.
+    """
+    if not _profile_models:
+        from .utils import get_client_classes
+
+        _profile_models.update(
+            (client_class.model._meta.app_label, client_class.model)
+            for client_class in get_client_classes())
+
+    return _profile_models
+
+
+def get_backend_path(model):
+    """
+    Returns the path of the backend in AUTHENTICATION_BACKENDS that
+    authenticates the users of the given profile model, or None if the
+    service's backend is not configured.
+    """
+    if model not in _backend_paths:
+        _backend_paths[model] = None
+
+        for path in settings.AUTHENTICATION_BACKENDS:
+            module, name = path.rsplit('.', 1)
+            backend = getattr(importlib.import_module(module), name, None)
+
+            if not isinstance(backend, type):
+                continue
+
+            if ((issubclass(backend, BaseSocialBackend) and
+                    backend.model is model) or
+                    (issubclass(backend, SocialProfileBackend) and
+                     backend().get_model(model._meta.app_label) is model)):
+                _backend_paths[model] = path
+                break
+
+    return _backend_paths[model]
@@ -0,0 +1,269 @@
+import logging
+import threading
+import time
+
+from collections import OrderedDict
+from hashlib import sha1
+
+from requests import Response
+from requests.structures import CaseInsensitiveDict
+
+from . import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+# The response headers that are stored along with the cached content.
+CACHED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified')
+
+
+class LRUCache(object):
+    """
+    Thread safe in-process cache that keeps up to 'maxsize' entries,
+    discarding the least recently used ones.
+    """
+    def __init__(self, maxsize=1000):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._data:
+                return default
+
+            # Moves the entry to the end of the queue.
+            value = self._data.pop(key)
+            self._data[key] = value
+
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = value
+
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+# The in-process tier of the response cache, shared by all the clients.
+local_responses = LRUCache(settings.RESPONSE_CACHE_SIZE)
+
+
+class ResponseCache(object):
+    """
+    Two tier cache for the responses of the services' APIs, the entries are
+    looked up first in the in-process LRU cache and then in the given Django
+    cache.
+
+    The entries are kept 'revalidate' seconds after they expire, this way
+    they can be revalidated with a conditional request to the service.
+    """
+    def __init__(self, cache, local=local_responses, revalidate=3600):
+        self.cache = cache
+        self.local = local
+        self.revalidate = revalidate
+
+    def get(self, key):
+        """
+        Returns the entry stored for the given key or None.
+        """
+        entry = self.local.get(key)
+
+        if entry is None:
+            entry = self.cache.get(key)
+
+            if entry is not None:
+                self.local.set(key, entry)
+
+        return entry
+
+    def set(self, key, entry, ttl):
+        """
+        Stores the given entry as fresh during 'ttl' seconds.
+        """
+        entry['expires_at'] = time.time() + ttl
+
+        self.local.set(key, entry)
+        self.cache.set(key, entry, ttl + self.revalidate)
+
+
+def get_response_key(*parts):
+    """
+    Returns the cache key of a response identified by the given parts.
+    """
+    digest = sha1(repr(parts).encode('utf-8')).hexdigest()
+
+    return 'socialnetworks:response:%s' % digest
+
+
+def to_entry(response):
+    """
+    Returns a cache entry for the given requests' response.
+    """
+    return {
+        'url': response.url,
+        'status_code': response.status_code,
+        'encoding': response.encoding,
+        'content': response.content,
+        'headers': dict((name, response.headers[name])
+                        for name in CACHED_HEADERS
+                        if name in response.headers)
+    }
+
+
+def to_response(entry):
+    """
+    Returns a requests' response rebuilt from the given cache entry.
+    """
+    response = Response()
+    response.url = entry['url']
+    response.status_code = entry['status_code']
+    response.encoding = entry['encoding']
+    response.headers = CaseInsensitiveDict(entry['headers'])
+    response._content = entry['content']
+    response.from_cache = True
+
+    return response
+
+
+def is_fresh(entry):
+    """
+    Returns True if the given cache entry has not expired yet.
+    """
+    return entry['expires_at'] > time.time()
+
+
+def get_conditional_headers(entry):
+    """
+    Returns the headers to revalidate the given cache entry.
+    """
+    headers = {}
+
+    if 'ETag' in entry['headers']:
+        headers['If-None-Match'] = entry['headers']['ETag']
+
+    if 'Last-Modified' in entry['headers']:
+        headers['If-Modified-Since'] = entry['headers']['Last-Modified']
+
+    return headers
+
+
+class ExpiringValue(object):
+    """
+    Thread safe holder of a value that is computed once and reused until it
+    expires.
+
+    When the value is missing or expired only the first caller computes it,
+    the concurrent callers wait for its result instead of computing it again.
+    The 'hits' and 'misses' counters tell how many times the value was
+    reused or computed.
+    """
+    def __init__(self):
+        self.value = None
+        self.expires_at = None
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def is_fresh(self):
+        return (self.expires_at is not None and
+                self.expires_at > time.time())
+
+    def get(self, compute):
+        """
+        Returns the stored value if it has not expired, otherwise calls
+        'compute' to obtain a tuple of the new value and the seconds that it
+        will be valid for, stores the value and returns it.
+        """
+        with self._lock:
+            if self.is_fresh():
+                self.hits += 1
+                return self.value
+
+            self.misses += 1
+            value, ttl = compute()
+
+            self.value = value
+            self.expires_at = time.time() + ttl
+
+            return value
+
+    def clear(self):
+        with self._lock:
+            self.value = None
+            self.expires_at = None
+
+
+class StaleCache(object):
+    """
+    Store backed by the given Django cache whose entries are fresh during
+    'ttl' seconds and then stale during 'stale_ttl' seconds.
+
+    Stale entries are returned at once while they are computed again in the
+    background by the given executor, only one caller at a time computes
+    each entry. The missing entries are computed by the caller. None values
+    are never stored.
+    """
+    def __init__(self, cache, ttl=300, stale_ttl=3600, lock_timeout=60):
+        self.cache = cache
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.lock_timeout = lock_timeout
+
+    def get(self, key, compute, executor):
+        """
+        Returns the value stored for the given key, calling 'compute' to
+        obtain it if it is missing or in the background if it is stale.
+        """
+        entry = self.cache.get(key)
+
+        if entry is None:
+            value = compute()
+
+            if value is not None:
+                self.set(key, value)
+
+            return value
+
+        if (entry['fresh_until'] <= time.time() and
+                self.cache.add(key + ':lock', 1, self.lock_timeout)):
+            executor.submit(self.refresh, key, compute)
+
+        return entry['value']
+
+    def set(self, key, value):
+        entry = {'value': value, 'fresh_until': time.time() + self.ttl}
+
+        self.cache.set(key, entry, self.ttl + self.stale_ttl)
+
+    def refresh(self, key, compute):
+        """
+        Computes and stores again the value of the given key, the entry is
+        removed if the new value is None. If it fails the error is logged and
+        the stale value is kept until it expires.
+        """
+        try:
+            value = compute()
+
+            if value is not None:
+                self.set(key, value)
+
+            else:
+                self.cache.delete(key)
+
+        except Exception:
+            logger.exception('Could not refresh the stale value of %s.', key)
+
+        finally:
+            self.cache.delete(key + ':lock')
@@ -1,12 +1,25 @@
+import copy
 import json
 import requests
+import time
+
+from datetime import timedelta
+from hashlib import sha256
 
 from requests_oauthlib import OAuth1, OAuth2
-from urlparse import parse_qsl
+from urlparse import parse_qsl, urlparse
 
 from django.contrib.auth import authenticate, login
+from django.dispatch import receiver
+from django.utils import timezone
 
+from . import (
+    caching, deadlines, ratelimit, resilience, settings, transport)
+from .backends import get_backend_path
+from .exceptions import CircuitOpenError, DeadlineExceeded
 from .models import BaseSocialProfile
+from .utils import get_cache
+from ..signals import disconnect
 
 
 class BaseOAuthClient(object):
@@ -55,6 +68,10 @@ class BaseOAuthClient(object):
     # The label of the refresh token in the service if available.
     refresh_token_label = None
 
+    # The url where the access token can be refreshed if available, defaults
+    # to 'access_token_url' in OAuth2 clients.
+    refresh_token_url = None
+
     # The label of the user's id in the service.
     uid_label = None
 
@@ -76,6 +93,10 @@ class BaseOAuthClient(object):
     # The model where the profiles are stored.
     model = None
 
+    # The service's dictionary inside SOCIALNETWORKS_CONFIGURATION, used to
+    # override the global settings for a single service.
+    configuration = None
+
     def __init__(self, profile=None, oauth_data=None):
         """
         Initialize a client instance storing the OAuth authentication data in
@@ -130,19 +151,337 @@ class BaseOAuthClient(object):
                 raise ValueError(
                     "'oauth_data' parameter must be a dict instance")
 
+    @classmethod
+    def get_setting(cls, name, default=None):
+        """
+        Returns the value of the given setting for the service, looking first
+        in the service's configuration and then in the global configuration.
+        """
+        configuration = cls.configuration or {}
+
+        return configuration.get(name, getattr(settings, name, default))
+
+    def get_session(self):
+        """
+        Returns the pooled session shared by all the clients of the service
+        in the current process.
+        """
+        return transport.get_session(
+            self.service_name,
+            pool_connections=self.get_setting('HTTP_POOL_CONNECTIONS'),
+            pool_maxsize=self.get_setting('HTTP_POOL_MAXSIZE'),
+            keep_alive=self.get_setting('HTTP_KEEP_ALIVE')
+        )
+
+    def get_timeout(self):
+        """
+        Returns a tuple of the connect and read timeouts for the requests to
+        the service, shortened to fit in the current deadline if any.
+
+        Raises DeadlineExceeded if the current deadline has already expired.
+        """
+        connect = self.get_setting('HTTP_CONNECT_TIMEOUT')
+        read = self.get_setting('HTTP_READ_TIMEOUT')
+        remaining = deadlines.remaining_time()
+
+        if remaining is None:
+            return (connect, read)
+
+        if remaining <= 0:
+            raise DeadlineExceeded(
+                'The deadline expired before requesting %s.' %
+                self.service_name
+            )
+
+        return (min(connect, remaining), min(read, remaining))
+
+    def get_circuit_breaker(self):
+        """
+        Returns the circuit breaker shared by all the clients of the service
+        in the current process.
+        """
+        return resilience.get_circuit_breaker(
+            self.service_name,
+            threshold=self.get_setting('CIRCUIT_BREAKER_THRESHOLD'),
+            reset_timeout=self.get_setting('CIRCUIT_BREAKER_RESET_TIMEOUT')
+        )
+
+    def get_retry_delay(self, attempt, response=None):
+        """
+        Returns the seconds to wait before retrying a failed request, honoring
+        the 'Retry-After' header of the given response if any. Returns None
+        if the service asks to wait longer than 'HTTP_RETRY_BACKOFF_MAX'.
+        """
+        cap = self.get_setting('HTTP_RETRY_BACKOFF_MAX')
+        delay = (resilience.get_retry_after(response)
+                 if response is not None else None)
+
+        if delay is None:
+            return resilience.get_backoff(
+                attempt, self.get_setting('HTTP_RETRY_BACKOFF'), cap)
+
+        return delay if delay <= cap else None
+
+    def get_rate_limiter(self):
+        """
+        Returns the rate limiter of the service, or None if the rate limiting
+        is disabled.
+        """
+        alias = self.get_setting('RATE_LIMIT_CACHE')
+
+        if alias is None:
+            return None
+
+        return ratelimit.RateLimiter(
+            self.service_name, get_cache(alias),
+            reserve=self.get_setting('RATE_LIMIT_RESERVE'),
+            max_wait=self.get_setting('RATE_LIMIT_MAX_WAIT')
+        )
+
+    def get_rate_limit_identities(self):
+        """
+        Returns a dictionary of the identities whose quota is consumed by the
+        requests of the client, indexed by scope ('app' or 'token').
+        """
+        oauth_data = getattr(self, '_oauth_data', None) or {}
+
+        return {
+            'app': self.app_key,
+            'token': oauth_data.get('access_token')
+        }
+
+    def get_rate_limit_resource(self, url, response=None):
+        """
+        Returns the resource whose quota is consumed by a request to the given
+        url, the quotas of each identity are tracked per resource.
+
+        The resource is the one reported by the 'X-RateLimit-Resource' header
+        of the given response if any, otherwise the path of the url, since
+        services like Twitter limit each endpoint separately. Subclasses can
+        return None when the quota is shared by all the endpoints.
+        """
+        if response is not None:
+            resource = response.headers.get('X-RateLimit-Resource')
+
+            if resource:
+                return resource
+
+        return urlparse(url).path
+
+    def parse_rate_limit(self, response):
+        """
+        Returns a tuple of three elements: the scope of the quota, the number
+        of remaining calls and the UNIX timestamp when the quota is renewed,
+        as reported by the given response. Returns None if the response does
+        not tell anything about the quota.
+
+        Understands the 'X-RateLimit-*' headers of GitHub and the
+        'X-Rate-Limit-*' headers of Twitter, subclasses can override this
+        method to parse other formats.
+        """
+        headers = response.headers
+        scope = 'token' if self.get_rate_limit_identities()['token'] else 'app'
+        remaining = headers.get(
+            'X-RateLimit-Remaining', headers.get('X-Rate-Limit-Remaining'))
+        reset = headers.get(
+            'X-RateLimit-Reset', headers.get('X-Rate-Limit-Reset'))
+
+        if remaining is not None and reset is not None:
+            try:
+                return (scope, int(remaining), float(reset))
+
+            except ValueError:
+                pass
+
+        if response.status_code == 429:
+            retry_after = resilience.get_retry_after(response)
+            retry_after = retry_after if retry_after is not None else 60
+
+            return (scope, 0, time.time() + retry_after)
+
+        return None
+
+    def record_rate_limit(self, response, url=None):
+        """
+        Stores the quota reported by the given response of a request to the
+        given url in the rate limiter.
+        """
+        limiter = self.get_rate_limiter()
+        rate_limit = self.parse_rate_limit(response)
+
+        if limiter is not None and rate_limit is not None:
+            scope, remaining, reset = rate_limit
+            identity = self.get_rate_limit_identities()[scope]
+            resource = self.get_rate_limit_resource(
+                url or response.url, response)
+
+            if identity:
+                limiter.record(identity, remaining, reset, resource)
+
+    def _send(self, method, url, **kwargs):
+        """
+        Performs a single request through the service's pooled session.
+        """
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.get_timeout()
+
+        try:
+            response = self.get_session().request(method, url, **kwargs)
+
+        except requests.Timeout:
+            remaining = deadlines.remaining_time()
+
+            if remaining is not None and remaining <= 0:
+                raise DeadlineExceeded(
+                    'The deadline expired while requesting %s.' %
+                    self.service_name
+                )
+
+            raise
+
+        self.record_rate_limit(response, url)
+
+        return response
+
+    def _request(self, method, url, rate_limit=True, **kwargs):
+        """
+        Base method to perform requests through the service's pooled session.
+
+        Idempotent requests that fail with a connection error or a retryable
+        status code are retried up to 'HTTP_RETRIES' times, waiting a jittered
+        exponential backoff between attempts. The requests are rejected with
+        a CircuitOpenError while the service's circuit breaker is open.
+
+        The requests wait for the quota of the requested resource to be
+        renewed when it is about to run out, or fail with a RateLimitExceeded
+        if the wait is too long. Pass 'rate_limit' as False to perform the
+        request regardless of the known quota, as the validation and login
+        requests do, the quota reported by the response is still recorded.
+        """
+        limiter = self.get_rate_limiter()
+
+        if limiter is not None and rate_limit:
+            limiter.acquire(
+                self.get_rate_limit_identities().values(),
+                self.get_rate_limit_resource(url)
+            )
+
+        breaker = self.get_circuit_breaker()
+
+        if not breaker.allow_request():
+            raise CircuitOpenError(
+                'The requests to %s are suspended after repeated failures.' %
+                self.service_name
+            )
+
+        retries = (self.get_setting('HTTP_RETRIES')
+                   if method in resilience.IDEMPOTENT_METHODS else 0)
+        attempt = 0
+
+        try:
+            while True:
+                try:
+                    response = self._send(method, url, **kwargs)
+
+                except (requests.ConnectionError, requests.Timeout):
+                    delay = self.get_retry_delay(attempt)
+
+                    if attempt >= retries or not resilience.can_wait(delay):
+                        breaker.record_failure()
+                        raise
+
+                else:
+                    if response.status_code not in resilience.RETRY_STATUSES:
+                        breaker.record_success()
+                        return response
+
+                    delay = self.get_retry_delay(attempt, response)
+
+                    if attempt >= retries or not resilience.can_wait(delay):
+                        # Quota errors do not tell anything about the health
+                        # of the service.
+                        if response.status_code >= 500:
+                            breaker.record_failure()
+                        else:
+                            breaker.record_success()
+
+                        return response
+
+                    response.close()
+
+                time.sleep(delay)
+                attempt += 1
+
+        finally:
+            breaker.release()
+
+    def get_response_cache(self):
+        """
+        Returns the response cache of the service, or None if the response
+        cache is disabled.
+        """
+        alias = self.get_setting('RESPONSE_CACHE')
+
+        if alias is None:
+            return None
+
+        return caching.ResponseCache(
+            get_cache(alias),
+            revalidate=self.get_setting('RESPONSE_CACHE_REVALIDATE')
+        )
+
+    def _cached_get(self, endpoint, url, params={}, headers={}, **kwargs):
+        """
+        Performs a GET request through the response cache of the service.
+
+        Fresh responses are returned without contacting the service, expired
+        responses are revalidated with the 'If-None-Match' and
+        'If-Modified-Since' headers and returned again if the service answers
+        that they were not modified.
+        """
+        cache = self.get_response_cache()
+        ttl = (self.get_setting('RESPONSE_CACHE_TTLS') or {}).get(
+            endpoint, self.get_setting('RESPONSE_CACHE_TTL'))
+
+        if cache is None or not ttl:
+            return self._get(url, params=params, headers=headers, **kwargs)
+
+        key = caching.get_response_key(
+            self.service_name, url, sorted(params.items()),
+            sorted(headers.items()), self.get_rate_limit_identities()['token']
+        )
+        entry = cache.get(key)
+
+        if entry is not None:
+            if caching.is_fresh(entry):
+                return caching.to_response(entry)
+
+            headers = dict(headers, **caching.get_conditional_headers(entry))
+
+        response = self._get(url, params=params, headers=headers, **kwargs)
+
+        if response.status_code == 304 and entry is not None:
+            cache.set(key, entry, ttl)
+            return caching.to_response(entry)
+
+        if response.status_code == 200:
+            cache.set(key, caching.to_entry(response), ttl)
+
+        return response
+
     def _get(self, url, **kwargs):
         """
         Base method to perform GET requests by wrapping the
         'requests' python library.
         """
-        return requests.get(url, **kwargs)
+        return self._request('GET', url, **kwargs)
 
     def _post(self, url, data=None, **kwargs):
         """
         Base method to perform POST requests by wrapping the
         'requests' python library.
         """
-        return requests.post(url, data=data, **kwargs)
+        return self._request('POST', url, data=data, **kwargs)
 
     def encode_url(self, url, params={}):
         """
@@ -157,11 +496,32 @@ class BaseOAuthClient(object):
             enc_params = encoder._encode_params(params)
             return url + '?' + enc_params
 
-    def login(self, request, uid):
+    def login(self, request, uid, profile=None):
         """
         Logs the user in.
+
+        The user is taken from the given profile, or from the profile of the
+        given uid fetched along with its user in a single query, and bound to
+        the service's backend directly, so the authentication backends of
+        the other services are not queried. If the service's backend is not
+        in AUTHENTICATION_BACKENDS the user is authenticated as usual, the
+        service is not passed since only the socialnetworks backends accept
+        it.
         """
-        login(request, authenticate(**{'service_uid': uid}))
+        path = get_backend_path(self.model)
+
+        if path is None:
+            login(request, authenticate(service_uid=uid))
+
+        else:
+            if profile is None:
+                profile = self.model.objects.select_related('user').get(
+                    service_uid=uid)
+
+            user = profile.user
+            user.backend = path
+
+            login(request, user)
 
     def parse_response(self, data):
         """
@@ -198,11 +558,14 @@ class BaseOAuthClient(object):
         """
         raise NotImplementedError
 
-    def compose_authorization_url(self, callback_url):
+    def compose_authorization_url(self, callback_url, state=None):
         """
         Return the url where the user should be redirected to request
         authorization for its account details.
 
+        OAuth2 clients pass the given 'state' to the service, which sends it
+        back to the callback url.
+
         Subclasses must implement this method.
         """
         raise NotImplementedError
@@ -235,6 +598,56 @@ class BaseOAuthClient(object):
         """
         raise NotImplementedError
 
+    def get_token_validity_key(self, token):
+        """
+        Returns the key of the token validity cache for the given token.
+        """
+        digest = sha256(
+            ('%s:%s' % (self.service_name, token)).encode('utf-8'))
+
+        return 'socialnetworks:token:%s' % digest.hexdigest()
+
+    def check_access_token(self):
+        """
+        Cached version of debug_access_token for the client's access token.
+
+        Valid tokens are remembered in the 'TOKEN_VALIDITY_CACHE' during
+        'TOKEN_VALIDITY_TTL' seconds or until the token expires, whichever
+        comes first, so repeated validations of the same token are answered
+        without contacting the service.
+        """
+        alias = self.get_setting('TOKEN_VALIDITY_CACHE')
+
+        if alias is None:
+            return self.debug_access_token()
+
+        cache = get_cache(alias)
+        key = self.get_token_validity_key(self._oauth_data['access_token'])
+        result = cache.get(key)
+
+        if result is None:
+            result = self.debug_access_token()
+            ttl = self.get_setting('TOKEN_VALIDITY_TTL')
+            expiration = self._oauth_data.get('expiration')
+
+            if expiration is not None:
+                ttl = min(ttl, (expiration - timezone.now()).total_seconds())
+
+            if result[0] and ttl >= 1:
+                cache.set(key, result, int(ttl))
+
+        return result
+
+    def invalidate_access_token(self):
+        """
+        Removes the client's access token from the token validity cache.
+        """
+        alias = self.get_setting('TOKEN_VALIDITY_CACHE')
+
+        if alias is not None:
+            get_cache(alias).delete(
+                self.get_token_validity_key(self._oauth_data['access_token']))
+
     def refresh_access_token(self, profile=None, update=True):
         """
         Connects with the service to request a new access token for the
@@ -281,10 +694,17 @@ class BaseOAuthClient(object):
                 response data.
         """
         url = self.service_api_url + endpoint
-        auth = (auth if auth is not None else
-                self.compose_auth(self.get_auth_params()))
 
-        response = self._get(url, params=params, headers=headers, auth=auth)
+        # Only the responses of the requests authenticated with the client's
+        # own credentials can be stored in the response cache.
+        if auth is None:
+            auth = self.compose_auth(self.get_auth_params())
+            response = self._cached_get(
+                endpoint, url, params=params, headers=headers, auth=auth)
+
+        else:
+            response = self._get(
+                url, params=params, headers=headers, auth=auth)
 
         return response if raw else response.json()
 
@@ -325,6 +745,84 @@ class BaseOAuthClient(object):
 
         return response if raw else response.json()
 
+    def get_page(self, url, params={}):
+        """
+        Performs the request of a single page of a list endpoint and returns
+        the raw response.
+        """
+        auth = self.compose_auth(self.get_auth_params())
+
+        return self._get(url, params=params, auth=auth)
+
+    def get_page_items(self, data, items_label=None):
+        """
+        Returns the list of items contained in the given parsed page, found
+        under the 'items_label' key or the page itself if it is a list.
+        """
+        if isinstance(data, list):
+            return data
+
+        return data.get(items_label, []) if items_label else []
+
+    def get_next_page(self, response, data, url, params):
+        """
+        Returns a tuple of the url and the parameters to request the page
+        that follows the given one, or None if it is the last page.
+
+        Follows the 'Link: <url>; rel="next"' header, subclasses must
+        override this method to support other paging schemes.
+        """
+        next_link = response.links.get('next')
+
+        if next_link:
+            return (next_link['url'], {})
+
+        return None
+
+    def paginate(self, endpoint, params={}, items_label=None,
+                 max_pages=None):
+        """
+        Returns a generator that iterates over all the items of a list
+        endpoint of the service's API, requesting the pages lazily as the
+        items are consumed so only a page is kept in memory at a time.
+
+        Parameters:
+            - endpoint: a string that defines the endpoint where the
+                request will be directed, this will be concatenated with
+                the base API url.
+
+            - params: a dictionary containing all the extra get parameters
+                (querystring) of the first page.
+
+            - items_label: the key of the list of items in the response of
+                the endpoint if the response is not the list itself.
+
+            - max_pages: the max number of pages to request, all the pages
+                are requested if None.
+        """
+        url = self.service_api_url + endpoint
+        params = dict(params)
+        pages = 0
+
+        while True:
+            response = self.get_page(url, params=params)
+            data = response.json()
+
+            for item in self.get_page_items(data, items_label):
+                yield item
+
+            pages += 1
+
+            if max_pages is not None and pages >= max_pages:
+                return
+
+            next_page = self.get_next_page(response, data, url, params)
+
+            if next_page is None:
+                return
+
+            url, params = next_page
+
 
 class OAuth1Client(BaseOAuthClient):
     """
@@ -350,7 +848,7 @@ class OAuth1Client(BaseOAuthClient):
         # Requesting and parsing the request token.
         r = self._post(
             self.request_token_url, auth=oauth,
-            params={'oauth_callback': callback}
+            params={'oauth_callback': callback}, rate_limit=False
         )
 
         return self.parse_response(r.content)
@@ -365,7 +863,7 @@ class OAuth1Client(BaseOAuthClient):
         })
 
         # Requesting and parsing the access token.
-        r = self._post(self.access_token_url, auth=oauth)
+        r = self._post(self.access_token_url, auth=oauth, rate_limit=False)
 
         return self.parse_response(r.content)
 
@@ -383,6 +881,164 @@ class OAuth2Client(BaseOAuthClient):
     def compose_auth(self, auth_params={}):
         return OAuth2(client_id=self.app_key, token=auth_params)
 
+    def get_token_fields(self, credentials):
+        """
+        Returns a dictionary of the profile fields to update with the given
+        credentials returned by the service when an access token is granted.
+        """
+        fields = {
+            'oauth_access_token': credentials.get(self.access_token_label)
+        }
+
+        if credentials.get(self.refresh_token_label):
+            fields['oauth_refresh_token'] = credentials.get(
+                self.refresh_token_label)
+
+        if credentials.get(self.expiration_label):
+            fields['oauth_access_token_expires_at'] = (
+                timezone.now() + timedelta(
+                    seconds=int(credentials.get(self.expiration_label))))
+
+        return fields
+
+    def get_refresh_keys(self, refresh_token):
+        """
+        Returns the cache keys of the lock and the result of the refresh of
+        the given refresh token.
+        """
+        digest = sha256(
+            ('%s:%s' % (self.service_name, refresh_token)).encode('utf-8'))
+        base = 'socialnetworks:refresh:%s' % digest.hexdigest()
+
+        return (base + ':lock', base + ':result')
+
+    def update_access_token(self, profile, credentials, save=True):
+        """
+        Updates the given profile and the client's OAuth data with the
+        credentials returned by the service when the token was refreshed.
+        """
+        fields = self.get_token_fields(credentials)
+
+        for name, value in fields.items():
+            setattr(profile, name, value)
+
+        if save:
+            profile.save(update_fields=list(fields))
+
+        self._oauth_data.update({
+            'access_token': profile.oauth_access_token,
+            'refresh_token': profile.oauth_refresh_token,
+            'expiration': profile.oauth_access_token_expires_at
+        })
+
+    def request_refresh(self, refresh_token):
+        """
+        Performs the request to the service to refresh the access token.
+        """
+        params = {
+            'grant_type': 'refresh_token',
+            'refresh_token': refresh_token,
+            'client_id': self.app_key,
+            'client_secret': self.app_secret
+        }
+
+        r = self._post(
+            self.refresh_token_url or self.access_token_url, params=params)
+
+        return (r.status_code == 200, self.parse_response(r.content))
+
+    def wait_refresh(self, cache, key):
+        """
+        Waits for the refresh performed by another caller and returns its
+        result, or None if it did not finish in 'REFRESH_WAIT_TIMEOUT'
+        seconds or in the time left by the current deadline.
+        """
+        timeout = self.get_setting('REFRESH_WAIT_TIMEOUT')
+        remaining = deadlines.remaining_time()
+
+        if remaining is not None:
+            timeout = min(timeout, remaining)
+
+        until = time.time() + timeout
+
+        while True:
+            result = cache.get(key)
+
+            if result is not None or time.time() >= until:
+                return result
+
+            time.sleep(0.1)
+
+    def refresh_access_token(self, profile=None, update=True):
+        """
+        Requests a new access token for the given profile (or the client's
+        profile) using its refresh token.
+
+        Returns a tuple of two objects where the first element is a boolean
+        telling whether the refresh was successful and the second element is
+        the data returned by the service.
+
+        A lock is held in the 'REFRESH_LOCK_CACHE' while the refresh is
+        performed, so when several clients refresh the same token at the same
+        time only one request is sent to the service and the others wait for
+        its result. The callers that time out waiting get (False, None).
+
+        Pass update=True to force the profile to be updated with the
+        retrieved data.
+        """
+        profile = profile or getattr(self, '_profile', None)
+
+        if profile is None:
+            raise ValueError(
+                'A profile is required to refresh the access token.')
+
+        refresh_token = profile.oauth_refresh_token
+        alias = self.get_setting('REFRESH_LOCK_CACHE')
+
+        if alias is None:
+            success, data = self.request_refresh(refresh_token)
+
+            if update and success:
+                self.update_access_token(profile, data)
+
+            return (success, data)
+
+        cache = get_cache(alias)
+        lock_key, result_key = self.get_refresh_keys(refresh_token)
+        timeout = self.get_setting('REFRESH_LOCK_TIMEOUT')
+
+        # Reuses the result of a refresh that has just finished, the refresh
+        # token may have been already rotated by the service.
+        result = cache.get(result_key)
+
+        if result is None and not cache.add(lock_key, 1, timeout):
+            result = self.wait_refresh(cache, result_key)
+
+            if result is None:
+                return (False, None)
+
+        if result is not None:
+            success, data = result
+
+            # The caller that performed the refresh already saved the
+            # profile, only the instance in memory is updated.
+            if update and success:
+                self.update_access_token(profile, data, save=False)
+
+            return (success, data)
+
+        try:
+            success, data = self.request_refresh(refresh_token)
+            cache.set(result_key, (success, data), timeout)
+
+        finally:
+            cache.delete(lock_key)
+
+        if update and success:
+            self.update_access_token(profile, data)
+
+        return (success, data)
+
     def get_access_token(self, verifier=None, callback=None):
         # Composes the parameters for the request.
         params = {
@@ -394,6 +1050,110 @@ class OAuth2Client(BaseOAuthClient):
         }
 
         # Requesting and parsing the access token.
-        r = self._post(self.access_token_url, params=params)
+        r = self._post(
+            self.access_token_url, params=params, rate_limit=False)
 
         return self.parse_response(r.content)
+
+
+@receiver(disconnect)
+def invalidate_disconnected_token(sender, profile=None, **kwargs):
+    """
+    Removes the access token of a disconnected profile from the token
+    validity cache.
+    """
+    client_class = getattr(sender, 'client_class', None)
+
+    if profile is not None and client_class is not None:
+        client_class(profile).invalidate_access_token()
+
+
+class AsyncClientMixin(object):
+    """
+    Mixin that turns the methods of a client that connect with the service
+    into asynchronous methods.
+
+    Instead of blocking until the service responds, the asynchronous methods
+    return a 'concurrent.futures.Future' object resolved in the thread pool
+    shared by all the asynchronous clients of the service. Each request
+    still blocks a thread of the pool, so at most 'ASYNC_MAX_WORKERS'
+    requests to the service are performed at the same time and the others
+    wait in the pool's queue. The returned futures can be awaited by asyncio
+    code with 'asyncio.wrap_future'.
+    """
+    def get_executor(self):
+        """
+        Returns the executor shared by all the asynchronous clients of the
+        service in the current process.
+        """
+        return transport.get_executor(
+            self.service_name,
+            max_workers=self.get_setting('ASYNC_MAX_WORKERS')
+        )
+
+    def get_sync_client(self):
+        """
+        Returns a synchronous copy of the client that shares its OAuth data
+        and profile, used to perform the requests inside the executor.
+        """
+        sync_class = [
+            cls for cls in type(self).__mro__
+            if not issubclass(cls, AsyncClientMixin)
+        ][0]
+
+        client = copy.copy(self)
+        client.__class__ = sync_class
+
+        return client
+
+    def submit(self, method_name, *args, **kwargs):
+        """
+        Schedules the call of the given method of the synchronous client in
+        the executor and returns the future of its result.
+
+        The call is bound to the deadline of the current thread, if any.
+        """
+        method = getattr(self.get_sync_client(), method_name)
+        remaining = deadlines.remaining_time()
+
+        def call():
+            with deadlines.deadline(remaining):
+                return method(*args, **kwargs)
+
+        return self.get_executor().submit(call)
+
+    def get(self, *args, **kwargs):
+        return self.submit('get', *args, **kwargs)
+
+    def post(self, *args, **kwargs):
+        return self.submit('post', *args, **kwargs)
+
+    def get_request_token(self, *args, **kwargs):
+        return self.submit('get_request_token', *args, **kwargs)
+
+    def get_access_token(self, *args, **kwargs):
+        return self.submit('get_access_token', *args, **kwargs)
+
+    def debug_access_token(self, *args, **kwargs):
+        return self.submit('debug_access_token', *args, **kwargs)
+
+    def check_access_token(self, *args, **kwargs):
+        return self.submit('check_access_token', *args, **kwargs)
+
+    def refresh_access_token(self, *args, **kwargs):
+        return self.submit('refresh_access_token', *args, **kwargs)
+
+    def retrieve_user_data(self, *args, **kwargs):
+        return self.submit('retrieve_user_data', *args, **kwargs)
+
+
+class AsyncOAuth1Client(AsyncClientMixin, OAuth1Client):
+    """
+    Base asynchronous client for OAuth1 services.
+    """
+
+
+class AsyncOAuth2Client(AsyncClientMixin, OAuth2Client):
+    """
+    Base asynchronous client for OAuth2 services.
+    """
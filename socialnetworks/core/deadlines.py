@@ -0,0 +1,48 @@
+import threading
+import time
+
+
+_local = threading.local()
+
+
+class deadline(object):
+    """
+    Context manager that limits the time that the requests to the services'
+    APIs performed by the current thread may spend inside its block.
+
+    When the budget is spent the remaining requests fail immediately with a
+    DeadlineExceeded exception, and the timeouts of the requests performed
+    before are shortened to fit in the budget. Nested deadlines can only
+    shorten the budget of the outer ones. Pass None to disable the deadline.
+    """
+    def __init__(self, seconds):
+        self.seconds = seconds
+
+    def __enter__(self):
+        self.previous = getattr(_local, 'expires_at', None)
+
+        if self.seconds is not None:
+            expires_at = time.time() + self.seconds
+
+            if self.previous is not None:
+                expires_at = min(expires_at, self.previous)
+
+            _local.expires_at = expires_at
+
+        return self
+
+    def __exit__(self, *exc_info):
+        _local.expires_at = self.previous
+
+
+def remaining_time():
+    """
+    Returns the seconds left before the current thread's deadline expires,
+    or None if there is no deadline.
+    """
+    expires_at = getattr(_local, 'expires_at', None)
+
+    if expires_at is None:
+        return None
+
+    return expires_at - time.time()
@@ -0,0 +1,282 @@
+import importlib
+import logging
+
+from concurrent.futures import wait
+from functools import wraps
+from hashlib import sha256
+
+from django.conf import settings
+from django.core.urlresolvers import reverse
+from django.http import HttpResponseRedirect
+
+from . import deadlines, transport
+from .caching import StaleCache
+from .settings import ASYNC_MAX_WORKERS, FETCH_DEADLINE
+from .storage import SessionStorage, get_storage
+from .utils import SERVICE_CLIENTS, get_cache, get_social_profile
+
+
+logger = logging.getLogger(__name__)
+
+
+def get_data_key(client):
+    """
+    Returns the key of the profile data cache for the client's user.
+    """
+    digest = sha256(('%s:%s' % (
+        client.service_name, client._oauth_data['access_token']
+    )).encode('utf-8'))
+
+    return 'socialnetworks:data:%s' % digest.hexdigest()
+
+
+def retrieve_data(client, retrieve):
+    """
+    Returns the data retrieved from the service by calling 'retrieve' with
+    the given client.
+
+    If 'PROFILE_DATA_CACHE' is set the data is kept in the cache, where it
+    is fresh during 'PROFILE_DATA_TTL' seconds and then stale during
+    'PROFILE_DATA_STALE_TTL' seconds. Stale data is returned at once and
+    retrieved again in the background, so a slow service does not delay
+    the response.
+    """
+    alias = client.get_setting('PROFILE_DATA_CACHE')
+
+    if alias is None:
+        return retrieve(client)
+
+    store = StaleCache(
+        get_cache(alias),
+        ttl=client.get_setting('PROFILE_DATA_TTL'),
+        stale_ttl=client.get_setting('PROFILE_DATA_STALE_TTL')
+    )
+    executor = transport.get_executor(
+        client.service_name,
+        max_workers=client.get_setting('ASYNC_MAX_WORKERS')
+    )
+
+    return store.get(
+        get_data_key(client), lambda: retrieve(client), executor)
+
+
+class DataFetcher(object):
+    """
+    Fetches the user's data from the service of the given client class, the
+    data is retrieved by calling 'retrieve' with a client for the user's
+    profile.
+
+    The data is kept under the given key in the storage configured by the
+    'DATA_STORAGE' setting, it is not retrieved again while it is stored.
+    If the user's access token is invalid the user is redirected to the
+    given login url name.
+    """
+    def __init__(self, client_class, key, retrieve, login_url):
+        self.client_class = client_class
+        self.key = key
+        self.retrieve = retrieve
+        self.login_url = login_url
+
+    def get_storage(self, request):
+        """
+        Returns the storage of the data, removing the data stored in the
+        user's session by the previous versions unless the session is the
+        configured storage.
+        """
+        storage = get_storage(self.client_class, self.key)
+
+        if (not isinstance(storage, SessionStorage) and
+                self.key in request.session):
+            del request.session[self.key]
+
+        return storage
+
+    def get_client(self, request):
+        """
+        Returns a client for the current user's profile or None.
+        """
+        profile = get_social_profile(request, self.client_class.model)
+
+        return self.client_class(profile) if profile else None
+
+    def check_and_retrieve(self, client):
+        """
+        Checks the validity of the access token before retrieving the data,
+        returns None if the token is invalid.
+        """
+        valid, data = client.check_access_token()
+
+        if not valid:
+            return None
+
+        return self.retrieve(client)
+
+    def fetch(self, client):
+        """
+        Returns the user's data retrieved from the service, or from the
+        profile data cache if enabled, or None if the token is invalid.
+        """
+        return retrieve_data(client, self.check_and_retrieve)
+
+    def decorate(self, function):
+        """
+        Extends the given view to fetch the user's data before it is called.
+        """
+        @wraps(function)
+        def function_wrapper(request, *args, **kwargs):
+            storage = self.get_storage(request)
+
+            # Tries to create a client for the current user.
+            client = self.get_client(request)
+
+            # If the client for this user was successfully created and the
+            # user's data is not retrieved yet from the service: checks the
+            # validity of the current access token, if the token is valid
+            # retrieves the data from the service, if the token is invalid
+            # then requests a new token.
+            if client and not storage.exists(request):
+                data = self.fetch(client)
+
+                if data is None:
+
+                    return HttpResponseRedirect(reverse(self.login_url))
+
+                else:
+                    # Makes the retrieved data available to the view.
+                    storage.remember(request, data)
+
+                    # Creates the response object and stores the retrieved
+                    # data signed and compressed in the storage, where it is
+                    # valid only for the seconds specified in settings.
+                    response = function(request, *args, **kwargs)
+                    storage.save(request, response, data)
+
+                    return response
+
+            # If there is no client for the current user but it has data
+            # stored (when a user disconnects its profile), removes the data.
+            elif not client and storage.exists(request):
+                # Stores temporarily a empty data, this way we can check
+                # quickly in the view if the user has disconnected its
+                # profile.
+                storage.remember(request, None)
+
+                # Creates the response object and deletes the data.
+                response = function(request, *args, **kwargs)
+                storage.delete(request, response)
+
+                return response
+
+            return function(request, *args, **kwargs)
+
+        return function_wrapper
+
+
+def get_fetchers(services=None):
+    """
+    Returns a list of tuples of the app label and the data fetcher of the
+    given services (app labels, ie, 'facebook'), or of all the installed
+    services if None.
+    """
+    fetchers = []
+
+    for app, path in SERVICE_CLIENTS:
+        label = app.rsplit('.', 1)[1]
+
+        if app not in settings.INSTALLED_APPS or (
+                services is not None and label not in services):
+            continue
+
+        module = importlib.import_module(app + '.decorators')
+        fetchers.append((label, module.fetcher))
+
+    return fetchers
+
+
+def fetch_social_data(services=None, timeout=None):
+    """
+    Decorator that extends a view to fetch the user's data from several
+    services at the same time, pass the app labels of the services (ie,
+    ['facebook', 'twitter']) or None for all the installed services.
+
+    The tokens of the connected services are validated and their data is
+    retrieved concurrently within a shared deadline of 'timeout' seconds
+    (defaults to the 'FETCH_DEADLINE' setting), so the view waits only for
+    the slowest service. The data of each service is available in the
+    'social_data' dictionary of the request indexed by its app label, it is
+    None for the services that are not connected, whose token is invalid,
+    that did not respond in time or that failed, the errors are logged.
+    """
+    def decorator(function):
+        @wraps(function)
+        def function_wrapper(request, *args, **kwargs):
+            request.social_data = {}
+            storages = {}
+            pending = []
+            removed = []
+
+            for label, fetcher in get_fetchers(services):
+                storage = storages[label] = fetcher.get_storage(request)
+                client = fetcher.get_client(request)
+
+                if client and not storage.exists(request):
+                    pending.append((label, fetcher, client))
+
+                elif not client and storage.exists(request):
+                    storage.remember(request, None)
+                    removed.append(storage)
+
+            seconds = FETCH_DEADLINE if timeout is None else timeout
+            executor = transport.get_executor(
+                'socialnetworks:fetch',
+                max_workers=ASYNC_MAX_WORKERS
+            )
+            saved = []
+
+            with deadlines.deadline(seconds):
+                remaining = deadlines.remaining_time()
+
+                def call(fetcher, client):
+                    with deadlines.deadline(remaining):
+                        return fetcher.fetch(client)
+
+                futures = [
+                    executor.submit(call, pending_fetcher, pending_client)
+                    for _, pending_fetcher, pending_client in pending
+                ]
+                wait(futures, timeout=remaining)
+
+            for (label, _, _), future in zip(pending, futures):
+                if not future.done():
+                    continue
+
+                try:
+                    data = future.result()
+
+                except Exception:
+                    # The data of a failed service is None, as if it did not
+                    # respond in time.
+                    logger.exception(
+                        'Could not fetch the user data from %s.', label)
+                    continue
+
+                if data is not None:
+                    storages[label].remember(request, data)
+                    saved.append((storages[label], data))
+
+            for label, storage in storages.items():
+                request.social_data[label] = storage.get(request)
+
+            response = function(request, *args, **kwargs)
+
+            for storage, data in saved:
+                storage.save(request, response, data)
+
+            for storage in removed:
+                storage.delete(request, response)
+
+            return response
+
+        return function_wrapper
+
+    return decorator
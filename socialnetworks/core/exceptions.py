@@ -0,0 +1,29 @@
+class ClientError(Exception):
+    """
+    Base exception raised by the clients when a request to the service's API
+    can not be performed.
+    """
+
+
+class DeadlineExceeded(ClientError):
+    """
+    Raised when the time budget of the current deadline is spent before or
+    while performing a request to the service's API.
+    """
+
+
+class CircuitOpenError(ClientError):
+    """
+    Raised when a request is rejected without contacting the service because
+    its circuit breaker is open after repeated failures.
+    """
+
+
+class RateLimitExceeded(ClientError):
+    """
+    Raised when a request is held back because the quota of the service is
+    exhausted, 'retry_after' tells the seconds until the quota is renewed.
+    """
+    def __init__(self, message=None, retry_after=None):
+        super(RateLimitExceeded, self).__init__(message)
+        self.retry_after = retry_after
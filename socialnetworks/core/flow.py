@@ -0,0 +1,87 @@
+class FlowState(object):
+    """
+    Request scoped copy of the data that an OAuth flow stores in the user's
+    session under the given key.
+
+    The data is read from the session the first time that it is accessed
+    and the changes are collected in memory, 'commit' writes them to the
+    session at most once and only if something changed.
+
+    Stateless flows never read nor write the session, their data is loaded
+    from and dumped to the 'state' parameter by the views, unless 'persist'
+    is called to continue the flow with the session.
+    """
+    def __init__(self, session, key, stateless=False):
+        self.session = session
+        self.key = key
+        self.stateless = stateless
+        self.data = {} if stateless else None
+        self.changed = False
+
+    def load(self):
+        """
+        Returns the dictionary of the flow data.
+        """
+        if self.data is None:
+            self.data = dict(self.session.get(self.key) or {})
+
+        return self.data
+
+    def get(self, key):
+        return self.load().get(key)
+
+    def update(self, **values):
+        data = self.load()
+
+        for key, value in values.items():
+            if key not in data or data[key] != value:
+                data[key] = value
+                self.changed = True
+
+    def pop(self, key):
+        data = self.load()
+
+        if key in data:
+            self.changed = True
+
+        return data.pop(key, None)
+
+    def replace(self, data):
+        """
+        Replaces the whole flow data with the given dictionary.
+        """
+        self.data = dict(data)
+        self.changed = True
+
+    def clear(self):
+        """
+        Removes all the flow data.
+        """
+        if self.load():
+            self.changed = True
+
+        self.data = {}
+
+    def persist(self):
+        """
+        Turns a stateless flow into a flow stored in the session, so its data
+        is written by the next commit.
+        """
+        self.stateless = False
+        self.changed = True
+
+    def commit(self):
+        """
+        Writes the flow data to the session if it changed, removing the
+        session's object if the data is empty.
+        """
+        if self.stateless or not self.changed:
+            return
+
+        if self.data:
+            self.session[self.key] = self.data
+
+        elif self.key in self.session:
+            del self.session[self.key]
+
+        self.changed = False
@@ -63,13 +63,12 @@ class SocialUserCreationForm(forms.ModelForm):
         Verifies that the given email address is not used by any already
         registered user in the site.
         """
-        try:
-            user = User.objects.get(email=self.cleaned_data['email'])
+        # Imported here since the settings module imports this form.
+        from .utils import get_users_by_email
 
-        except User.DoesNotExist:
-            user = None
+        email = self.cleaned_data['email']
 
-        if user is not None:
+        if email and get_users_by_email(email).exists():
             raise forms.ValidationError(_(
                 'This email address is already in use, please provide a '
                 'different email address.'
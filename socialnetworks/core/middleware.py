@@ -0,0 +1,18 @@
+from django.utils.functional import SimpleLazyObject
+
+from .utils import get_social_profiles
+
+
+class SocialProfilesMiddleware(object):
+    """
+    Middleware that adds the 'social_profiles' attribute to the request, a
+    dictionary of the current user's profiles indexed by the profile model of
+    each installed service.
+
+    The profiles are loaded lazily with a single query the first time that
+    the attribute is accessed. Must be placed after the
+    AuthenticationMiddleware.
+    """
+    def process_request(self, request):
+        request.social_profiles = SimpleLazyObject(
+            lambda: get_social_profiles(request.user))
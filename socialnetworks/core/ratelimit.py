@@ -0,0 +1,101 @@
+import math
+import time
+
+from hashlib import sha1
+
+from . import deadlines
+from .exceptions import RateLimitExceeded
+
+
+class RateLimiter(object):
+    """
+    Keeps track of the quota reported by a service for each of the
+    identities (app keys, access tokens) that perform requests to its API and
+    holds back the requests whose quota is about to run out.
+
+    The quota is stored in the given Django cache, so it is shared by all the
+    processes that use the same cache backend.
+    """
+    def __init__(self, service, cache, reserve=1, max_wait=5):
+        self.service = service
+        self.cache = cache
+        self.reserve = reserve
+        self.max_wait = max_wait
+
+    def get_keys(self, identity, resource=None):
+        """
+        Returns the cache keys of the remaining calls and the reset time of
+        the given identity for the given resource (ie, an endpoint), or for
+        all the requests of the identity if the resource is None.
+        """
+        digest = sha1(('%s:%s:%s' % (
+            self.service, identity, resource or '')).encode('utf-8'))
+        base = 'socialnetworks:ratelimit:%s' % digest.hexdigest()
+
+        return (base + ':remaining', base + ':reset')
+
+    def record(self, identity, remaining, reset, resource=None):
+        """
+        Stores the number of calls to the given resource that the given
+        identity can perform until the 'reset' UNIX timestamp.
+        """
+        remaining_key, reset_key = self.get_keys(identity, resource)
+        timeout = max(1, int(math.ceil(reset - time.time())))
+
+        self.cache.set_many(
+            {remaining_key: remaining, reset_key: reset}, timeout)
+
+    def get_wait(self, identities, resource=None):
+        """
+        Returns the seconds to wait until all the given identities have quota
+        for a new call to the given resource, or 0 if the call can be
+        performed right away.
+        """
+        keys = dict((identity, self.get_keys(identity, resource))
+                    for identity in identities)
+        values = self.cache.get_many(
+            [key for pair in keys.values() for key in pair])
+        now = time.time()
+        wait = 0
+
+        for remaining_key, reset_key in keys.values():
+            remaining = values.get(remaining_key)
+            reset = values.get(reset_key)
+
+            if (remaining is not None and reset is not None and
+                    remaining <= self.reserve and reset > now):
+                wait = max(wait, reset - now)
+
+        return wait
+
+    def acquire(self, identities, resource=None):
+        """
+        Blocks until the given identities have quota for a new call to the
+        given resource and consumes it.
+
+        Raises RateLimitExceeded if the wait is longer than 'max_wait' or
+        than the time left by the current deadline.
+        """
+        identities = [identity for identity in identities if identity]
+        wait = self.get_wait(identities, resource)
+
+        if wait:
+            remaining = deadlines.remaining_time()
+
+            if wait > self.max_wait or (remaining is not None and
+                                        wait >= remaining):
+                raise RateLimitExceeded(
+                    'The quota of %s is exhausted for the next %d seconds.' %
+                    (self.service, wait), retry_after=wait
+                )
+
+            time.sleep(wait)
+
+        # Consumes the quota in advance, so concurrent callers sharing the
+        # identity see it before the service reports the actual value.
+        for identity in identities:
+            try:
+                self.cache.decr(self.get_keys(identity, resource)[0])
+
+            except ValueError:
+                pass
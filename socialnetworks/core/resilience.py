@@ -0,0 +1,155 @@
+import random
+import threading
+import time
+
+from email.utils import mktime_tz, parsedate_tz
+
+from . import deadlines
+
+
+# The HTTP methods whose requests can be safely repeated.
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# The response status codes that are worth retrying.
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# The circuit breakers of the current process, indexed by service.
+_breakers = {}
+
+_lock = threading.Lock()
+
+
+class CircuitBreaker(object):
+    """
+    Tracks the failures of the requests to a service to stop sending
+    requests while the service is failing.
+
+    The breaker opens after 'threshold' consecutive failures and rejects all
+    the requests during 'reset_timeout' seconds, then it lets a single probe
+    request pass (half open state), if the probe succeeds the breaker closes
+    again, otherwise it remains open for another 'reset_timeout' seconds.
+
+    Pass a falsy 'threshold' to never open the breaker.
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, threshold=5, reset_timeout=30):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self._lock = threading.Lock()
+
+    def allow_request(self):
+        """
+        Returns True if a request to the service can be performed.
+        """
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+
+            if (self.state == self.OPEN and
+                    time.time() - self.opened_at >= self.reset_timeout):
+                self.state = self.HALF_OPEN
+
+            if self.state == self.HALF_OPEN and not self.probing:
+                self.probing = True
+                return True
+
+            return False
+
+    def record_success(self):
+        """
+        Closes the breaker after a successful request.
+        """
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self.probing = False
+
+    def record_failure(self):
+        """
+        Counts a failed request, opening the breaker if the failure was the
+        probe or the threshold of consecutive failures was reached.
+        """
+        with self._lock:
+            self.failures += 1
+
+            if self.threshold and (self.state == self.HALF_OPEN or
+                                   self.failures >= self.threshold):
+                self.state = self.OPEN
+                self.opened_at = time.time()
+
+            self.probing = False
+
+    def release(self):
+        """
+        Lets another request probe the service if the current probe ended
+        without telling whether the service has recovered.
+        """
+        with self._lock:
+            self.probing = False
+
+
+def get_circuit_breaker(key, **kwargs):
+    """
+    Returns the circuit breaker shared by all the clients of the given key
+    (usually the name of the service) in the current process, creating it
+    with the given keyword arguments if it does not exist yet.
+    """
+    if key in _breakers:
+        return _breakers[key]
+
+    with _lock:
+        if key not in _breakers:
+            _breakers[key] = CircuitBreaker(**kwargs)
+
+        return _breakers[key]
+
+
+def get_retry_after(response):
+    """
+    Returns the seconds to wait before retrying the request as told by the
+    'Retry-After' header of the given response, or None if the header is
+    missing or malformed.
+    """
+    value = response.headers.get('Retry-After')
+
+    if not value:
+        return None
+
+    try:
+        return max(0, float(value))
+
+    except ValueError:
+        parsed = parsedate_tz(value)
+
+        if parsed is None:
+            return None
+
+        return max(0, mktime_tz(parsed) - time.time())
+
+
+def get_backoff(attempt, base, cap):
+    """
+    Returns a random delay between 0 and the exponential backoff of the
+    given attempt, limited to 'cap' seconds.
+    """
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def can_wait(delay):
+    """
+    Returns True if the current thread can sleep the given delay without
+    exceeding its deadline.
+    """
+    if delay is None:
+        return False
+
+    remaining = deadlines.remaining_time()
+
+    return remaining is None or delay < remaining
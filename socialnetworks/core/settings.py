@@ -30,6 +30,111 @@ if [True for app in settings.INSTALLED_APPS if 'socialnetwork' in app]:
             False
         )
 
+        # Tells whether the users are matched by their email through the
+        # indexed table of normalized emails instead of a case insensitive
+        # lookup. The table is kept up to date when the users are saved only
+        # while it is enabled, run the backfill_normalized_emails command
+        # for the existing users every time it is enabled.
+        NORMALIZED_EMAIL_LOOKUP = CONFIGURATION.get(
+            'NORMALIZED_EMAIL_LOOKUP', False)
+
+        # Connection pooling of the HTTP sessions used by the API clients,
+        # each service can override these values in its own configuration.
+        HTTP_POOL_CONNECTIONS = CONFIGURATION.get('HTTP_POOL_CONNECTIONS', 10)
+        HTTP_POOL_MAXSIZE = CONFIGURATION.get('HTTP_POOL_MAXSIZE', 10)
+        HTTP_KEEP_ALIVE = CONFIGURATION.get('HTTP_KEEP_ALIVE', True)
+
+        # Connect and read timeouts in seconds of the requests performed by
+        # the API clients.
+        HTTP_CONNECT_TIMEOUT = CONFIGURATION.get('HTTP_CONNECT_TIMEOUT', 3.05)
+        HTTP_READ_TIMEOUT = CONFIGURATION.get('HTTP_READ_TIMEOUT', 10)
+
+        # Retries of the idempotent requests that fail with a connection
+        # error or a 429/5xx status code, waiting a jittered exponential
+        # backoff in seconds between attempts.
+        HTTP_RETRIES = CONFIGURATION.get('HTTP_RETRIES', 2)
+        HTTP_RETRY_BACKOFF = CONFIGURATION.get('HTTP_RETRY_BACKOFF', 0.5)
+        HTTP_RETRY_BACKOFF_MAX = CONFIGURATION.get(
+            'HTTP_RETRY_BACKOFF_MAX', 10)
+
+        # Consecutive failures that suspend the requests to a service and
+        # seconds to wait before probing the service again.
+        CIRCUIT_BREAKER_THRESHOLD = CONFIGURATION.get(
+            'CIRCUIT_BREAKER_THRESHOLD', 5)
+        CIRCUIT_BREAKER_RESET_TIMEOUT = CONFIGURATION.get(
+            'CIRCUIT_BREAKER_RESET_TIMEOUT', 30)
+
+        # Cache alias where the quota reported by the services is stored,
+        # None disables the rate limiting. The requests are held back up to
+        # RATE_LIMIT_MAX_WAIT seconds when the remaining calls reach
+        # RATE_LIMIT_RESERVE.
+        RATE_LIMIT_CACHE = CONFIGURATION.get('RATE_LIMIT_CACHE', 'default')
+        RATE_LIMIT_RESERVE = CONFIGURATION.get('RATE_LIMIT_RESERVE', 1)
+        RATE_LIMIT_MAX_WAIT = CONFIGURATION.get('RATE_LIMIT_MAX_WAIT', 5)
+
+        # Cache alias where the responses of the GET requests are stored,
+        # None disables the response cache. The responses are fresh during
+        # RESPONSE_CACHE_TTL seconds, or the seconds given for its endpoint in
+        # RESPONSE_CACHE_TTLS, and then kept RESPONSE_CACHE_REVALIDATE seconds
+        # more to be revalidated with conditional requests.
+        RESPONSE_CACHE = CONFIGURATION.get('RESPONSE_CACHE', None)
+        RESPONSE_CACHE_TTL = CONFIGURATION.get('RESPONSE_CACHE_TTL', 60)
+        RESPONSE_CACHE_TTLS = CONFIGURATION.get('RESPONSE_CACHE_TTLS', {})
+        RESPONSE_CACHE_REVALIDATE = CONFIGURATION.get(
+            'RESPONSE_CACHE_REVALIDATE', 3600)
+        RESPONSE_CACHE_SIZE = CONFIGURATION.get('RESPONSE_CACHE_SIZE', 1000)
+
+        # Cache alias where the valid access tokens are remembered during
+        # TOKEN_VALIDITY_TTL seconds, None disables the token validity cache.
+        TOKEN_VALIDITY_CACHE = CONFIGURATION.get(
+            'TOKEN_VALIDITY_CACHE', 'default')
+        TOKEN_VALIDITY_TTL = CONFIGURATION.get('TOKEN_VALIDITY_TTL', 300)
+
+        # Cache alias where the locks of the access token refreshes are held,
+        # so a single refresh of each token is performed at a time across all
+        # the processes. The lock is released after REFRESH_LOCK_TIMEOUT
+        # seconds and the concurrent callers wait up to REFRESH_WAIT_TIMEOUT
+        # seconds for its result, None disables the lock.
+        REFRESH_LOCK_CACHE = CONFIGURATION.get('REFRESH_LOCK_CACHE', 'default')
+        REFRESH_LOCK_TIMEOUT = CONFIGURATION.get('REFRESH_LOCK_TIMEOUT', 30)
+        REFRESH_WAIT_TIMEOUT = CONFIGURATION.get('REFRESH_WAIT_TIMEOUT', 10)
+
+        # Cache alias where the data retrieved by the fetch_*_data decorators
+        # is stored, None disables the cache. The data is fresh during
+        # PROFILE_DATA_TTL seconds, then it is served stale during
+        # PROFILE_DATA_STALE_TTL seconds while it is retrieved again in the
+        # background.
+        PROFILE_DATA_CACHE = CONFIGURATION.get('PROFILE_DATA_CACHE', None)
+        PROFILE_DATA_TTL = CONFIGURATION.get('PROFILE_DATA_TTL', 300)
+        PROFILE_DATA_STALE_TTL = CONFIGURATION.get(
+            'PROFILE_DATA_STALE_TTL', 3600)
+
+        # Where the data fetched by the fetch_*_data decorators is kept
+        # during COOKIE_MAX_AGE seconds, either 'cookie', 'session', 'cache'
+        # (stored in DATA_STORAGE_CACHE) or the import path of a storage
+        # class. The data is signed and compressed if DATA_COMPRESS is True.
+        DATA_STORAGE = CONFIGURATION.get('DATA_STORAGE', 'cookie')
+        DATA_STORAGE_CACHE = CONFIGURATION.get('DATA_STORAGE_CACHE', 'default')
+        DATA_COMPRESS = CONFIGURATION.get('DATA_COMPRESS', True)
+
+        # Tells whether the data of the OAuth2 flows is carried in a signed
+        # 'state' parameter instead of the user's session, the parameter is
+        # valid during STATE_MAX_AGE seconds.
+        STATELESS = CONFIGURATION.get('STATELESS', False)
+        STATE_MAX_AGE = CONFIGURATION.get('STATE_MAX_AGE', 600)
+
+        # Max number of seconds that the callback view may spend performing
+        # requests to the service's API, None disables the limit.
+        CALLBACK_DEADLINE = CONFIGURATION.get('CALLBACK_DEADLINE', 20)
+
+        # Max number of seconds that the fetch_social_data decorator waits
+        # for the services, None disables the limit.
+        FETCH_DEADLINE = CONFIGURATION.get('FETCH_DEADLINE', 5)
+
+        # Max number of threads that perform the requests of the asynchronous
+        # clients of each service.
+        ASYNC_MAX_WORKERS = CONFIGURATION.get('ASYNC_MAX_WORKERS', 10)
+
         # Imports and defines the setup form class.
         form_class = CONFIGURATION.get(
             'SETUP_FORM_CLASS',
@@ -0,0 +1,203 @@
+import importlib
+
+from django.core import signing
+
+from .utils import get_cache
+
+
+# The salt of the signature of the stored data.
+DATA_SALT = 'socialnetworks.data'
+
+
+class BaseDataStorage(object):
+    """
+    Base class of the storages of the user's data fetched by the
+    fetch_*_data decorators.
+
+    The data is stored under the given key as a signed (and compressed if
+    'compress' is True) payload that expires after 'max_age' seconds.
+    Subclasses must implement the 'read', 'write' and 'remove' methods.
+    """
+    def __init__(self, key, max_age=900, compress=True):
+        self.key = key
+        self.max_age = max_age
+        self.compress = compress
+
+    def dumps(self, data):
+        """
+        Returns the payload of the given data.
+        """
+        return signing.dumps(data, salt=DATA_SALT, compress=self.compress)
+
+    def loads(self, payload):
+        """
+        Returns the data of the given payload, or None if it is missing,
+        tampered or expired.
+        """
+        if not payload:
+            return None
+
+        try:
+            return signing.loads(payload, salt=DATA_SALT, max_age=self.max_age)
+
+        except signing.BadSignature:
+            return None
+
+    def get_payload_size(self, data):
+        """
+        Returns the size in bytes of the payload of the given data.
+        """
+        return len(self.dumps(data))
+
+    def get(self, request):
+        """
+        Returns the data stored for the current request or None.
+        """
+        remembered = getattr(request, '_socialnetworks_data', {})
+
+        if self.key in remembered:
+            return remembered[self.key]
+
+        return self.loads(self.read(request))
+
+    def exists(self, request):
+        """
+        Returns True if there is valid data stored for the current request.
+        """
+        return self.get(request) is not None
+
+    def remember(self, request, data):
+        """
+        Makes the given data available to the current request before it is
+        saved in the storage.
+        """
+        if not hasattr(request, '_socialnetworks_data'):
+            request._socialnetworks_data = {}
+
+        request._socialnetworks_data[self.key] = data
+
+    def save(self, request, response, data):
+        """
+        Stores the given data for the following requests.
+        """
+        self.write(request, response, self.dumps(data))
+
+    def delete(self, request, response):
+        """
+        Removes the stored data.
+        """
+        self.remove(request, response)
+
+    def read(self, request):
+        raise NotImplementedError
+
+    def write(self, request, response, payload):
+        raise NotImplementedError
+
+    def remove(self, request, response):
+        raise NotImplementedError
+
+
+class CookieStorage(BaseDataStorage):
+    """
+    Stores the data in a cookie, it is sent by the browser with every
+    request to the site.
+    """
+    def read(self, request):
+        return request.COOKIES.get(self.key)
+
+    def write(self, request, response, payload):
+        response.set_cookie(
+            self.key, payload, max_age=self.max_age, httponly=True)
+
+    def remove(self, request, response):
+        response.delete_cookie(self.key)
+
+
+class SessionStorage(BaseDataStorage):
+    """
+    Stores the data in the user's session.
+    """
+    def read(self, request):
+        return request.session.get(self.key)
+
+    def write(self, request, response, payload):
+        request.session[self.key] = payload
+
+    def remove(self, request, response):
+        request.session.pop(self.key, None)
+
+
+class CacheStorage(BaseDataStorage):
+    """
+    Stores the data of each user in the Django cache of the given alias,
+    nothing is stored for anonymous users.
+    """
+    def __init__(self, key, max_age=900, compress=True, cache='default'):
+        super(CacheStorage, self).__init__(key, max_age, compress)
+        self.cache = get_cache(cache)
+
+    def get_cache_key(self, request):
+        if not request.user.is_authenticated():
+            return None
+
+        return 'socialnetworks:data:%s:%s' % (self.key, request.user.pk)
+
+    def read(self, request):
+        key = self.get_cache_key(request)
+
+        return self.cache.get(key) if key else None
+
+    def write(self, request, response, payload):
+        key = self.get_cache_key(request)
+
+        if key:
+            self.cache.set(key, payload, self.max_age)
+
+    def remove(self, request, response):
+        key = self.get_cache_key(request)
+
+        if key:
+            self.cache.delete(key)
+
+
+# The storage classes that can be chosen by name in the settings.
+STORAGES = {
+    'cookie': CookieStorage,
+    'session': SessionStorage,
+    'cache': CacheStorage,
+}
+
+
+def get_storage(client_class, key):
+    """
+    Returns the storage of the data of the given client class stored under
+    the given key, as configured by the 'DATA_STORAGE' setting, either the
+    name of a storage ('cookie', 'session' or 'cache') or the import path of
+    a storage class.
+    """
+    name = client_class.get_setting('DATA_STORAGE')
+
+    if name in STORAGES:
+        storage_class = STORAGES[name]
+
+    else:
+        module, class_ = name.rsplit('.', 1)
+        storage_class = getattr(importlib.import_module(module), class_)
+
+    kwargs = {
+        'max_age': client_class.get_setting('COOKIE_MAX_AGE'),
+        'compress': client_class.get_setting('DATA_COMPRESS'),
+    }
+
+    if issubclass(storage_class, CacheStorage):
+        kwargs['cache'] = client_class.get_setting('DATA_STORAGE_CACHE')
+
+    return storage_class(key, **kwargs)
+
+
+def get_cookie_size(request):
+    """
+    Returns the size in bytes of the cookies sent with the given request.
+    """
+    return len(request.META.get('HTTP_COOKIE', ''))
@@ -0,0 +1,122 @@
+import os
+import threading
+
+import requests
+
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from requests.cookies import RequestsCookieJar
+
+
+# The pooled sessions of the current process, indexed by service.
+_sessions = {}
+
+# The executors of the current process, indexed by service.
+_executors = {}
+
+# The id of the process that owns the pooled sessions and executors.
+_owner_pid = None
+
+_lock = threading.Lock()
+
+
+class NullCookieJar(RequestsCookieJar):
+    """
+    Cookie jar that discards every cookie, the pooled sessions are shared by
+    all the users so the cookies set by the services must not be sent along
+    with the requests of other users.
+    """
+    def set_cookie(self, cookie, *args, **kwargs):
+        pass
+
+
+def _check_owner():
+    """
+    Discards the sessions and executors inherited from a parent process, this
+    way worker processes never share sockets or threads with its master.
+
+    Must be called while holding the lock.
+    """
+    global _owner_pid
+
+    if _owner_pid != os.getpid():
+        _sessions.clear()
+        _executors.clear()
+        _owner_pid = os.getpid()
+
+
+def create_session(pool_connections=10, pool_maxsize=10, keep_alive=True):
+    """
+    Returns a new requests session whose adapters keep a pool of
+    'pool_connections' hosts with up to 'pool_maxsize' connections each.
+
+    If 'keep_alive' is False the connections are closed after every request.
+    The session does not keep the cookies set by the responses, only the
+    cookies passed to each request are sent.
+    """
+    session = requests.Session()
+    session.cookies = NullCookieJar()
+
+    for prefix in ('https://', 'http://'):
+        session.mount(prefix, HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize
+        ))
+
+    if not keep_alive:
+        session.headers['Connection'] = 'close'
+
+    return session
+
+
+def get_session(key, **kwargs):
+    """
+    Returns the session shared by all the clients of the given key (usually
+    the name of the service) in the current process, creating it with the
+    given keyword arguments if it does not exist yet.
+
+    Sessions inherited from a parent process are discarded the first time
+    this function is called after a fork.
+    """
+    if _owner_pid == os.getpid() and key in _sessions:
+        return _sessions[key]
+
+    with _lock:
+        _check_owner()
+
+        if key not in _sessions:
+            _sessions[key] = create_session(**kwargs)
+
+        return _sessions[key]
+
+
+def get_executor(key, max_workers=10):
+    """
+    Returns the thread pool executor shared by all the asynchronous clients
+    of the given key in the current process, creating it with up to
+    'max_workers' threads if it does not exist yet.
+
+    Executors inherited from a parent process are discarded the first time
+    this function is called after a fork.
+    """
+    if _owner_pid == os.getpid() and key in _executors:
+        return _executors[key]
+
+    with _lock:
+        _check_owner()
+
+        if key not in _executors:
+            _executors[key] = ThreadPoolExecutor(max_workers=max_workers)
+
+        return _executors[key]
+
+
+def close_sessions():
+    """
+    Closes and discards all the pooled sessions of the current process.
+    """
+    with _lock:
+        for session in _sessions.values():
+            session.close()
+
+        _sessions.clear()
@@ -1,29 +1,42 @@
+import importlib
+import operator
 import pytz
 
 from datetime import datetime
+from functools import reduce
 from random import randint
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.core import signing
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import connections, router, transaction
+from django.db.models import Q
+from django.utils import timezone
 
 from unidecode import unidecode
 
-from .settings import COOKIE_MAX_AGE
+from .settings import NORMALIZED_EMAIL_LOOKUP
 
 
-def read_social_data(request, key):
-    """
-    Search the current request for user's social information, search first
-    in the user's session, if there is no information then search in the
-    request's cookies.
-
-    Returns a dictionary of the social information if found, otherwise
-    returns None.
-    """
-    data = request.session.get(key, request.get_signed_cookie(
-        key, max_age=COOKIE_MAX_AGE, default=None))
+# The app of each service and the import path of its client class.
+SERVICE_CLIENTS = (
+    ('socialnetworks.facebook',
+     'socialnetworks.facebook.clients.FacebookClient'),
+    ('socialnetworks.github',
+     'socialnetworks.github.clients.GitHubClient'),
+    ('socialnetworks.linkedin',
+     'socialnetworks.linkedin.clients.LinkedInClient'),
+    ('socialnetworks.moves',
+     'socialnetworks.moves.clients.MovesAppClient'),
+    ('socialnetworks.paypal',
+     'socialnetworks.paypal.clients.PayPalClient'),
+    ('socialnetworks.twitter',
+     'socialnetworks.twitter.clients.TwitterClient'),
+)
 
-    return signing.loads(data) if data else None
+# The number of usernames suggested by compose_username that are checked
+# with a single query.
+USERNAME_CANDIDATES = 20
 
 
 def compose_username(data):
@@ -34,7 +47,13 @@ def compose_username(data):
     used as a base for the suggestion, otherwise the base will be generated by
     the concatenation of the fist and last name of the given data.
     Then the base will be unidecoded and space cleaned and then it will be
-    concatenated with a random number between 1 and 9999.
+    concatenated with a random number of up to four digits.
+
+    The candidates are generated in batches of USERNAME_CANDIDATES and
+    checked against the database with a single query per batch, if all of
+    them are taken the next batch uses numbers with one more digit. Note
+    that the OR of case insensitive lookups can not use an index on most
+    database backends, so each batch scans the users table once.
     """
     UserModel = get_user_model()
 
@@ -45,16 +64,50 @@ def compose_username(data):
         raw_name = data['first_name'] + data['last_name']
 
     unidecoded_name = unidecode(raw_name.replace(' ', ''))
-    randomize = lambda n: '%s%d' % (n, randint(1, 9999))
-    valid = False
+    digits = 4
+
+    while True:
+        numbers = set()
+
+        while len(numbers) < USERNAME_CANDIDATES:
+            numbers.add(randint(1, 10 ** digits - 1))
 
-    while not valid:
-        username = randomize(unidecoded_name)
+        candidates = ['%s%d' % (unidecoded_name, n) for n in numbers]
+        lookups = reduce(operator.or_, [
+            Q(username__iexact=candidate) for candidate in candidates])
+        taken = set(name.lower() for name in UserModel.objects.filter(
+            lookups).values_list('username', flat=True))
 
-        if not UserModel.objects.filter(username__iexact=username):
-            valid = True
+        for candidate in candidates:
+            if candidate.lower() not in taken:
+                return candidate
 
-    return username
+        digits += 1
+
+
+def normalize_email(email):
+    """
+    Returns the given email address trimmed and lowercased.
+    """
+    return (email or '').strip().lower()
+
+
+def get_users_by_email(email):
+    """
+    Returns a queryset of the users whose email address matches the given
+    one regardless of the case and the surrounding spaces.
+
+    If NORMALIZED_EMAIL_LOOKUP is True the users are matched through the
+    indexed table of normalized emails, otherwise with a case insensitive
+    lookup that can not use an index.
+    """
+    UserModel = get_user_model()
+
+    if NORMALIZED_EMAIL_LOOKUP:
+        return UserModel.objects.filter(
+            normalized_email__email=normalize_email(email))
+
+    return UserModel.objects.filter(email__iexact=email.strip())
 
 
 def to_timestamp(date_time):
@@ -78,3 +131,172 @@ def from_timestamp(timestamp):
         return None
 
     return datetime.fromtimestamp(timestamp, tz=pytz.UTC)
+
+
+def get_cache(alias='default'):
+    """
+    Returns the Django cache backend of the given alias.
+    """
+    try:
+        from django.core.cache import caches
+
+    except ImportError:
+        from django.core.cache import get_cache as get_cache_
+
+        return get_cache_(alias)
+
+    return caches[alias]
+
+
+def get_client_classes():
+    """
+    Returns the list of client classes of the services whose apps are in the
+    INSTALLED_APPS setting.
+    """
+    classes = []
+
+    for app, path in SERVICE_CLIENTS:
+        if app in settings.INSTALLED_APPS:
+            module, name = path.rsplit('.', 1)
+            classes.append(getattr(importlib.import_module(module), name))
+
+    return classes
+
+
+def atomic(using=None):
+    """
+    Returns a context manager that runs its block inside a database
+    transaction, compatible with the Django versions prior to 1.6.
+    """
+    if hasattr(transaction, 'atomic'):
+        return transaction.atomic(using=using)
+
+    return transaction.commit_on_success(using=using)
+
+
+def get_related_object(field):
+    """
+    Returns the object that describes the reverse side of the given relation
+    field, it is the 'remote_field' of the field on Django >= 1.9, its 'rel'
+    on Django 1.8 and its 'related' RelatedObject on the previous versions.
+    """
+    related = getattr(field, 'remote_field', None)
+
+    if related is None:
+        related = field.rel
+
+    if not hasattr(related, 'get_accessor_name'):
+        related = field.related
+
+    return related
+
+
+def set_cached_related(field, instance, value):
+    """
+    Stores the given value in the cache of the given relation of the
+    instance, so accessing the relation does not query the database.
+    """
+    if hasattr(field, 'set_cached_value'):
+        field.set_cached_value(instance, value)
+
+    else:
+        setattr(instance, field.get_cache_name(), value)
+
+
+def get_social_profiles(user):
+    """
+    Returns a dictionary of the profiles of the given user for every
+    installed service indexed by the profile model of the service, the value
+    is None if the user has no profile in the service.
+
+    All the profiles are loaded in a single UNION query and the reverse
+    accessors of the user (ie, 'user.facebookoauthprofile') are primed with
+    the result, so they do not query the database either.
+    """
+    models = [client_class.model for client_class in get_client_classes()]
+    profiles = dict((model, None) for model in models)
+
+    if not models or user is None or not user.is_authenticated():
+        return profiles
+
+    # The columns of the union, the models that lack a column select NULL.
+    columns = []
+
+    for model in models:
+        for field in model._meta.fields:
+            if field.column not in columns:
+                columns.append(field.column)
+
+    using = router.db_for_read(models[0])
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    queries = []
+    params = []
+
+    for model in models:
+        fields = dict((f.column, f) for f in model._meta.fields)
+        selected = [
+            qn(column) if column in fields else 'NULL AS %s' % qn(column)
+            for column in columns
+        ]
+
+        queries.append('SELECT %%s, %s FROM %s WHERE %s = %%s' % (
+            ', '.join(selected), qn(model._meta.db_table),
+            qn(model._meta.get_field('user').column)
+        ))
+        params.extend([model._meta.db_table, user.pk])
+
+    cursor = connection.cursor()
+    cursor.execute(' UNION ALL '.join(queries), params)
+    rows = cursor.fetchall()
+
+    for model in models:
+        field = model._meta.get_field('user')
+
+        for row in rows:
+            if row[0] != model._meta.db_table:
+                continue
+
+            values = dict(zip(columns, row[1:]))
+            kwargs = {}
+
+            for f in model._meta.fields:
+                value = f.to_python(values[f.column])
+
+                if (settings.USE_TZ and isinstance(value, datetime) and
+                        timezone.is_naive(value)):
+                    value = timezone.make_aware(value, timezone.utc)
+
+                kwargs[f.attname] = value
+
+            profile = model(**kwargs)
+            profile._state.adding = False
+            profile._state.db = using
+            set_cached_related(field, profile, user)
+            profiles[model] = profile
+
+        set_cached_related(get_related_object(field), user, profiles[model])
+
+    return profiles
+
+
+def get_social_profile(request, model):
+    """
+    Returns the profile of the given model for the current user or None,
+    using the profiles loaded in 'request.social_profiles' if available.
+    """
+    if not request.user.is_authenticated():
+        return None
+
+    profiles = getattr(request, 'social_profiles', None)
+
+    if profiles is not None:
+        return profiles.get(model)
+
+    related = get_related_object(model._meta.get_field('user'))
+
+    try:
+        return getattr(request.user, related.get_accessor_name())
+
+    except ObjectDoesNotExist:
+        return None
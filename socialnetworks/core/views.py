@@ -7,18 +7,32 @@ from urlparse import urlparse, parse_qs
 from django.contrib import messages
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ImproperlyConfigured
+from django.core import signing
 from django.core.urlresolvers import resolve, reverse
+from django.db import IntegrityError
 from django.http import HttpResponseForbidden
 from django.shortcuts import redirect
 from django.utils import timezone
+from django.utils.crypto import constant_time_compare, get_random_string
 from django.utils.translation import ugettext_lazy as _
 from django.views.generic.base import View, TemplateView
 
 from . import settings
-from .utils import compose_username, from_timestamp, to_timestamp
+from .deadlines import deadline
+from .flow import FlowState
+from .utils import (
+    atomic, compose_username, from_timestamp, get_users_by_email,
+    to_timestamp)
 from ..signals import activation, connect, disconnect, login
 
 
+# The salt of the signature of the user data stored in the session.
+USER_DATA_SALT = 'socialnetworks.user_data'
+
+# The salt of the signature of the state parameter of the stateless flows.
+STATE_SALT = 'socialnetworks.state'
+
+
 class OAuthMixin(object):
     """
     Mixin that defines the necessary methods for OAuth views.
@@ -28,6 +42,9 @@ class OAuthMixin(object):
     # the OAuth flow.
     client_class = None
 
+    # The data of the current flow, created when the request is dispatched.
+    flow = None
+
     def __init__(self, *args, **kwargs):
         super(OAuthMixin, self).__init__(*args, **kwargs)
 
@@ -40,6 +57,15 @@ class OAuthMixin(object):
                 "'%s' view." % self.__class__
             )
 
+    def dispatch(self, request, *args, **kwargs):
+        # Collects the changes to the flow data and writes them to the
+        # session once the response is ready.
+        self.flow = FlowState(request.session, self.client.session_key)
+        response = super(OAuthMixin, self).dispatch(request, *args, **kwargs)
+        self.flow.commit()
+
+        return response
+
     def _build_absolute_uri(self, uri):
         """
         Compose and return the fully qualified url for the given uri by
@@ -47,22 +73,53 @@ class OAuthMixin(object):
         """
         return self.request.build_absolute_uri(uri)
 
+    def is_stateless(self):
+        """
+        Returns True if the flow data is carried in the 'state' parameter
+        instead of the user's session, only OAuth2 services support it.
+        """
+        return (self.client.oauth_version == 2 and
+                bool(self.client.get_setting('STATELESS')))
+
+    def dump_state(self):
+        """
+        Returns the flow data as a signed and compressed string to be passed
+        as the 'state' parameter.
+        """
+        return signing.dumps(self.flow.load(), salt=STATE_SALT, compress=True)
+
+    def load_state(self, value):
+        """
+        Returns the flow data of the given 'state' parameter.
+
+        Raises BadSignature if the parameter was tampered with or is older
+        than 'STATE_MAX_AGE' seconds.
+        """
+        return signing.loads(
+            value or '', salt=STATE_SALT,
+            max_age=self.client.get_setting('STATE_MAX_AGE')
+        )
+
+    def get_state_cookie_name(self):
+        """
+        Returns the name of the cookie that binds the 'state' parameter of a
+        stateless flow to the user's browser.
+        """
+        return 'socialnetworks_%s_state' % self.client.model._meta.app_label
+
     def _get_session(self):
         """
         Returns the current session's object to store the data that will
         be used trough the OAuth flow.
         """
-        if self.client.session_key not in self.request.session:
-            self.request.session[self.client.session_key] = {}
-
-        return self.request.session[self.client.session_key]
+        return self.flow.load()
 
     def _set_session(self, dictionary):
         """
-        Updates the current session's object, useful if the backend is not
-        configured to save session in every request.
+        Replaces the current session's object, the change is written to the
+        session when the response is ready.
         """
-        self.request.session[self.client.session_key] = dictionary
+        self.flow.replace(dictionary)
 
     def _get_namespace(self):
         """
@@ -83,15 +140,13 @@ class OAuthMixin(object):
         Returns the provided key value from the current session's object. If
         key is not in the object returns None.
         """
-        return self._get_session().get(key, None)
+        return self.flow.get(key)
 
     def session_put(self, **dictionary):
         """
         Puts the given dictionary into the current session's object.
         """
-        session = self._get_session()
-        session.update(**dictionary)
-        self._set_session(session)
+        self.flow.update(**dictionary)
 
     def session_pop(self, key):
         """
@@ -99,19 +154,14 @@ class OAuthMixin(object):
         removes the key from the object. If key is not in the object returns
         None.
         """
-        session = self._get_session()
-        value = session.pop(key, None)
-        self._set_session(session)
-
-        return value
+        return self.flow.pop(key)
 
     def session_clear(self):
         """
         Removes the object where the flow information of the service are
         stored from the current user's session.
         """
-        if self.client.session_key in self.request.session:
-            del self.request.session[self.client.session_key]
+        self.flow.clear()
 
     def get_callback_url(self):
         """
@@ -141,6 +191,31 @@ class OAuthMixin(object):
         """
         raise NotImplementedError
 
+    def retrieve_user_data(self, profile=None):
+        """
+        Returns the available user data from the service's API for the given
+        profile, the data is retrieved only once per flow and then it is
+        taken from the user's session.
+        """
+        data = self.session_get('user_data')
+
+        if data is not None:
+            try:
+                return signing.loads(data, salt=USER_DATA_SALT)
+
+            except signing.BadSignature:
+                pass
+
+        profile = profile or self.get_profile()
+        data = self.client_class(profile).retrieve_user_data()
+
+        # The data is signed and compressed to keep the session (or the
+        # cookie of signed cookie sessions) small and untampered.
+        self.session_put(user_data=signing.dumps(
+            data, salt=USER_DATA_SALT, compress=True))
+
+        return data
+
 
 class OAuthDialogRedirectView(OAuthMixin, View):
     """
@@ -148,6 +223,11 @@ class OAuthDialogRedirectView(OAuthMixin, View):
     authorization dialog.
     """
     def post(self, request, *args, **kwargs):
+        # Stateless flows keep their data in memory until the redirection.
+        if self.is_stateless():
+            self.flow = FlowState(
+                request.session, self.client.session_key, stateless=True)
+
         # Clears the current session to avoid conflicts.
         self.session_clear()
 
@@ -162,6 +242,13 @@ class OAuthDialogRedirectView(OAuthMixin, View):
         if 'only_login' in request.POST:
             self.session_put(**{'only_login': request.POST['only_login']})
 
+        # Binds the state parameter to the user's browser with a random
+        # nonce also stored in a short lived cookie, so a state issued to
+        # another browser is rejected by the callback view.
+        if self.flow.stateless:
+            nonce = get_random_string(32)
+            self.session_put(**{'state_nonce': nonce})
+
         if self.client.oauth_version == 1:
             # Gets the OAuth request token.
             credentials = self.client.get_request_token(
@@ -178,7 +265,16 @@ class OAuthDialogRedirectView(OAuthMixin, View):
             })
 
         # Redirects the user to the authorization dialog.
-        return redirect(self.get_redirect_url())
+        response = redirect(self.get_redirect_url())
+
+        if self.flow.stateless:
+            response.set_cookie(
+                self.get_state_cookie_name(), nonce,
+                max_age=self.client.get_setting('STATE_MAX_AGE'),
+                secure=request.is_secure(), httponly=True
+            )
+
+        return response
 
     def get_redirect_url(self):
         """
@@ -191,6 +287,10 @@ class OAuthDialogRedirectView(OAuthMixin, View):
         elif self.client.oauth_version == 2:
             param = self.get_callback_url()
 
+            if self.flow.stateless:
+                return self.client.compose_authorization_url(
+                    param, state=self.dump_state())
+
         return self.client.compose_authorization_url(param)
 
 
@@ -198,11 +298,44 @@ class OAuthCallbackView(OAuthMixin, View):
     """
     Base view that handles the callback redirection from the service.
     """
+    def dispatch(self, request, *args, **kwargs):
+        # Limits the time that the view may spend waiting for the service,
+        # once it is spent the remaining requests raise DeadlineExceeded.
+        with deadline(self.client.get_setting('CALLBACK_DEADLINE')):
+            response = super(OAuthCallbackView, self).dispatch(
+                request, *args, **kwargs)
+
+        # The nonce of a stateless flow is valid only once.
+        if self.get_state_cookie_name() in request.COOKIES:
+            response.delete_cookie(self.get_state_cookie_name())
+
+        return response
+
     def get(self, request, *args, **kwargs):
         # Protects the view to be accessed by non OAuth requests.
         if self.client.verifier_label not in request.GET:
             return HttpResponseForbidden()
 
+        # Restores the data of a stateless flow from the state parameter.
+        if self.is_stateless():
+            try:
+                data = self.load_state(request.GET.get('state'))
+
+            except signing.BadSignature:
+                return HttpResponseForbidden()
+
+            # Rejects the states that were not issued to this browser.
+            nonce = data.pop('state_nonce', None)
+            cookie = request.COOKIES.get(self.get_state_cookie_name())
+
+            if not nonce or not cookie or not constant_time_compare(
+                    nonce, cookie):
+                return HttpResponseForbidden()
+
+            self.flow = FlowState(
+                request.session, self.client.session_key, stateless=True)
+            self.flow.replace(data)
+
         request_token = self.session_get('oauth_request_token')
         request_token_secret = self.session_get('oauth_request_token_secret')
 
@@ -255,50 +388,35 @@ class OAuthCallbackView(OAuthMixin, View):
 
         self.session_put(**profile_data)
 
-        # Gets the lookups to retrieve or create the profile.
-        lookup_kwargs = {'service_uid': service_uid}
-
-        # Tries to retrieve the profile.
-        try:
-            profile = self.client.model.objects.get(**lookup_kwargs)
-            created = False
-
-        except self.client.model.DoesNotExist:
-            profile = None
-
-        # If there is no profile and the button clicked was only login
-        # redirects the user to the page where it comes from, otherwise
-        # creates a new profile with the given data.
-        if not profile:
-            if self.session_get('only_login'):
-                parsed = urlparse(self.session_pop('only_login'))
-                params = parse_qs(parsed.query)
-                params.update(oauth_error=True)
-
-                return redirect(self.client.encode_url(parsed.path, params))
-
-            else:
-                profile = self.client.model.objects.create(**lookup_kwargs)
-                created = True
-
         # Reconvert the token expiration to a Python datetime object.
         profile_data.update(oauth_access_token_expires_at=from_timestamp(
             profile_data['oauth_access_token_expires_at']))
 
         # Updates the profile to make sure that we have always the most
-        # recent token.
-        profile.__dict__.update(**profile_data)
-        profile.save()
-
-        # If the profile was created or has no user then tries to attach the
-        # profile to current user, if the user is not logged in then redirects
-        # it to the final setup view to create a new user instance prefilled
-        # with the data retrieved from the service's API.
-        if created or not profile.user:
-            if request.user.is_authenticated():
-                profile.user = request.user
-                profile.save()
+        # recent token, or creates it if the button clicked was not only
+        # login. If the profile has no user it is attached to the current
+        # user in the same query.
+        user = request.user if request.user.is_authenticated() else None
+        profile, created, attached = self.upsert_profile(
+            service_uid, profile_data, user=user,
+            create=not self.session_get('only_login')
+        )
 
+        # If there is no profile and the button clicked was only login
+        # redirects the user to the page where it comes from.
+        if profile is None:
+            parsed = urlparse(self.session_pop('only_login'))
+            params = parse_qs(parsed.query)
+            params.update(oauth_error=True)
+
+            return redirect(self.client.encode_url(parsed.path, params))
+
+        # If the profile was created or has no user then it was attached to
+        # the current user, if the user is not logged in then redirects it to
+        # the final setup view to create a new user instance prefilled with
+        # the data retrieved from the service's API.
+        if created or not profile.user:
+            if attached:
                 # Tells to the site that the user has connected its profile.
                 connect.send(
                     sender=self.__class__, user=request.user,
@@ -315,6 +433,10 @@ class OAuthCallbackView(OAuthMixin, View):
             else:
                 self.session_put(**{'new_user': True})
 
+                # Retrieves the user's data while the token is fresh, the
+                # setup view reuses it until the flow completes.
+                self.retrieve_user_data(profile)
+
         elif (profile.user and profile.user != request.user and
                 request.user.is_authenticated()):
 
@@ -328,7 +450,8 @@ class OAuthCallbackView(OAuthMixin, View):
         else:
             if not request.user.is_authenticated():
                 # Logs the user in if it is not logged in yet.
-                self.client.login(request, self.session_get('service_uid'))
+                self.client.login(
+                    request, self.session_get('service_uid'), profile=profile)
 
                 # Tells to the site that the user was logged in.
                 login.send(
@@ -342,7 +465,72 @@ class OAuthCallbackView(OAuthMixin, View):
                 service=self.client.service_name.lower()
             )
 
-        return redirect(self.get_redirect_url())
+        url = self.get_redirect_url()
+
+        # The setup view continues a stateless flow with the user's session.
+        if self.flow.stateless and self.flow.get('new_user'):
+            self.flow.persist()
+
+        return redirect(url)
+
+    def upsert_profile(self, service_uid, data, user=None, create=True):
+        """
+        Updates the profile of the given service's user id with the given
+        data or creates it if it does not exist and 'create' is True. If the
+        profile has no user it is attached to the given user.
+
+        Returns a tuple of the profile (None if it does not exist and it was
+        not created), a boolean telling whether it was created and a boolean
+        telling whether it was attached to the given user.
+
+        The profile is fetched along with its user in a single query and then
+        it is inserted or updated in a single query, only the given fields
+        are written.
+        """
+        model = self.client.model
+        names = set(field.attname for field in model._meta.fields)
+        data = dict((k, v) for k, v in data.items()
+                    if k in names and k != 'service_uid')
+        queryset = model.objects.select_related('user')
+
+        with atomic():
+            try:
+                profile = queryset.get(service_uid=service_uid)
+
+            except model.DoesNotExist:
+                if not create:
+                    return (None, False, False)
+
+                try:
+                    with atomic():
+                        profile = model.objects.create(
+                            service_uid=service_uid, user=user, **data)
+
+                    return (profile, True, user is not None)
+
+                except IntegrityError as e:
+                    # Another request created the profile meanwhile, so it
+                    # is updated instead. The error is raised again if it
+                    # was caused by other constraint.
+                    try:
+                        profile = queryset.get(service_uid=service_uid)
+
+                    except model.DoesNotExist:
+                        raise e
+
+            for name, value in data.items():
+                setattr(profile, name, value)
+
+            fields = list(data) + ['last_modified']
+            attached = profile.user_id is None and user is not None
+
+            if attached:
+                profile.user = user
+                fields.append('user')
+
+            profile.save(update_fields=fields)
+
+        return (profile, False, attached)
 
     def get_redirect_url(self):
         """
@@ -397,15 +585,6 @@ class OAuthSetupView(OAuthMixin, TemplateView):
 
         return user
 
-    def retrieve_user_data(self):
-        """
-        Retrieve the available user data from the service's API.
-        """
-        profile = self.get_profile()
-        profiled_client = self.client_class(profile)
-
-        return profiled_client.retrieve_user_data()
-
     def get_context_data(self, **kwargs):
         context = super(OAuthSetupView, self).get_context_data(**kwargs)
         context['service'] = self.client.service_name
@@ -439,10 +618,8 @@ class OAuthSetupView(OAuthMixin, TemplateView):
             # If a existent user matches the data then links the OAuth profile
             # to its account.
             if check('email'):
-                filters = {'email__iexact': user_data['email']}
-
                 try:
-                    user = UserModel.objects.get(**filters)
+                    user = get_users_by_email(user_data['email']).get()
                     created = False
 
                 except UserModel.DoesNotExist:
@@ -483,7 +660,9 @@ class OAuthSetupView(OAuthMixin, TemplateView):
                         )
 
                     # Authenticates the new user.
-                    self.client.login(request, self.session_get('service_uid'))
+                    self.client.login(
+                        request, self.session_get('service_uid'),
+                        profile=profile)
 
                     # Tells to the site that the user was logged in.
                     login.send(sender=self.__class__, user=user,
@@ -495,7 +674,14 @@ class OAuthSetupView(OAuthMixin, TemplateView):
             # If no user was matched or created then redirect the user to the
             # final sertup view.
             # Suggest an username that does not exists in the site.
-            user_data['username'] = compose_username(user_data)
+            # The suggestion is kept for the reloads of the setup view.
+            username = self.session_get('suggested_username')
+
+            if username is None:
+                username = compose_username(user_data)
+                self.session_put(suggested_username=username)
+
+            user_data['username'] = username
 
             # Redirect the user to a custom setup url if provided.
             if self.setup_url is not None:
@@ -554,7 +740,8 @@ class OAuthSetupView(OAuthMixin, TemplateView):
             )
 
             # Authenticates the new user.
-            self.client.login(request, self.session_get('service_uid'))
+            self.client.login(
+                request, self.session_get('service_uid'), profile=profile)
 
             # Tells to the site that the user was logged in.
             login.send(
@@ -593,6 +780,10 @@ class OAuthSetupView(OAuthMixin, TemplateView):
         Return the url to redirect the user when the setup of the new account
         has successfully finished.
         """
+        # The flow has completed, so the user's data is no longer needed.
+        self.session_pop('user_data')
+        self.session_pop('suggested_username')
+
         url = self.session_pop('next') or '/'
 
         return self._build_absolute_uri(url)
@@ -625,7 +816,7 @@ class OAuthDisconnectView(OAuthMixin, View):
             # Tells to the site that the profile was disconnected.
             disconnect.send(
                 sender=self.__class__, user=user,
-                service=self.client.service_name.lower()
+                service=self.client.service_name.lower(), profile=profile
             )
 
             # Tells to the user that the disconnection was successful.
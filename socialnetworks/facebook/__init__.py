@@ -1,3 +1,3 @@
-from .clients import FacebookClient
+from .clients import AsyncFacebookClient, FacebookClient
 from .decorators import fetch_facebook_data
 from .utils import read_facebook_data
@@ -1,6 +1,17 @@
+import json
+import time
+
+from urllib import urlencode
+
 from . import settings
 from .models import FacebookOAuthProfile
-from ..core.clients import OAuth2Client
+from ..core.caching import ExpiringValue
+from ..core.clients import AsyncOAuth2Client, OAuth2Client
+
+
+# The app access token fetched from Facebook, shared by all the clients of
+# the process.
+app_access_token_cache = ExpiringValue()
 
 
 class FacebookClient(OAuth2Client):
@@ -11,8 +22,11 @@ class FacebookClient(OAuth2Client):
     app_key = settings.APP_ID
     app_secret = settings.APP_SECRET
     app_access_token = settings.APP_ACCESS_TOKEN
+    app_access_token_ttl = settings.APP_ACCESS_TOKEN_TTL
+    app_access_token_offline = settings.APP_ACCESS_TOKEN_OFFLINE
     scope = settings.SCOPE
     model = FacebookOAuthProfile
+    configuration = settings.FACEBOOK
 
     expiration_label = 'expires'
     authorization_url = 'https://www.facebook.com/v2.2/dialog/oauth'
@@ -21,7 +35,10 @@ class FacebookClient(OAuth2Client):
     service_api_url = 'https://graph.facebook.com/v2.2/'
     session_key = 'socialnetworks:facebook'
 
-    def compose_authorization_url(self, callback_url):
+    # The max number of requests that Facebook accepts in a single batch.
+    batch_size = 50
+
+    def compose_authorization_url(self, callback_url, state=None):
         """
         Return the url to request user authorization at Facebook.
         """
@@ -31,26 +48,84 @@ class FacebookClient(OAuth2Client):
             'scope': self.scope,
         }
 
+        if state is not None:
+            params['state'] = state
+
         return self.encode_url(self.authorization_url, params)
 
+    def fetch_app_access_token(self):
+        """
+        Fetches the app access token from Facebook and returns a tuple of the
+        token and the seconds that it should be reused.
+        """
+        params = {
+            'client_id': self.app_key,
+            'client_secret': self.app_secret,
+            'grant_type': 'client_credentials'
+        }
+
+        r = self._get(self.access_token_url, params=params, rate_limit=False)
+        data = self.parse_response(r.content)
+        ttl = self.app_access_token_ttl
+
+        if data.get('expires_in'):
+            ttl = min(ttl, int(data['expires_in']))
+
+        return (data['access_token'], ttl)
+
     def get_app_access_token(self):
         """
         Returns the app access token if it is defined in settings,
         otherwise fetches the token from Facebook.
+
+        The fetched token is shared by all the clients of the process during
+        'APP_ACCESS_TOKEN_TTL' seconds. If 'APP_ACCESS_TOKEN_OFFLINE' is True
+        the token is composed from the app id and secret without contacting
+        Facebook.
         """
         if self.app_access_token:
             return self.app_access_token
 
+        elif self.app_access_token_offline:
+            return '%s|%s' % (self.app_key, self.app_secret)
+
         else:
-            params = {
-                'client_id': self.app_key,
-                'client_secret': self.app_secret,
-                'grant_type': 'client_credentials'
-            }
+            return app_access_token_cache.get(self.fetch_app_access_token)
 
-            r = self._get(self.access_token_url, params=params)
+    def get_rate_limit_resource(self, url, response=None):
+        """
+        Returns None, the usage reported by Facebook is shared by all the
+        endpoints.
+        """
+        return None
+
+    def parse_rate_limit(self, response):
+        """
+        Returns the quota of the app as reported by the 'X-App-Usage' header.
+
+        Facebook reports the usage as percentages of a rolling one hour
+        window, so the remaining calls are measured in percentage points
+        and the app is considered exhausted when any of the usages reaches
+        'APP_USAGE_THRESHOLD'.
+        """
+        usage = response.headers.get('X-App-Usage')
+
+        if not usage:
+            return super(FacebookClient, self).parse_rate_limit(response)
+
+        try:
+            usage = max(json.loads(usage).values())
+
+        except (ValueError, AttributeError):
+            return None
 
-            return self.parse_response(r.content)['access_token']
+        if usage >= self.get_setting('APP_USAGE_THRESHOLD', 95):
+            remaining = 0
+
+        else:
+            remaining = int(100 - usage)
+
+        return ('app', remaining, time.time() + 60)
 
     def debug_access_token(self, token=None):
         """
@@ -68,11 +143,127 @@ class FacebookClient(OAuth2Client):
             'access_token': self.get_app_access_token()
         }
 
-        r = self._get(self.token_debug_url, params=params)
+        r = self._get(self.token_debug_url, params=params, rate_limit=False)
         data = r.json()
 
         return (data['data']['is_valid'], data['data'])
 
+    def debug_access_tokens(self, tokens):
+        """
+        Check if the given access tokens are yet valid performing batch
+        requests to Facebook.
+
+        Return a list with a tuple for each token, where the first element is
+        a boolean that tells whether the token is valid or not, or None if
+        its validation request failed or did not complete, and the second
+        element is the data resulting of the token validation or the error.
+        """
+        results = self.batch([
+            {'relative_url': 'debug_token', 'params': {'input_token': token}}
+            for token in tokens
+        ], access_token=self.get_app_access_token())
+
+        return [
+            (data['data']['is_valid'], data['data']) if success
+            else (None, data)
+            for success, data in results
+        ]
+
+    def compose_batch_request(self, request):
+        """
+        Return the given request in the format expected by the batch
+        parameter of the graph API.
+        """
+        relative_url = request['relative_url']
+
+        if request.get('params'):
+            relative_url = self.encode_url(relative_url, request['params'])
+
+        composed = {
+            'method': request.get('method', 'GET').upper(),
+            'relative_url': relative_url
+        }
+
+        if request.get('body'):
+            composed['body'] = urlencode(request['body'])
+
+        return composed
+
+    def batch(self, requests, access_token=None):
+        """
+        Performs the given requests to the graph API sending up to 50
+        requests per HTTP round trip.
+
+        Each request is a dictionary with the 'relative_url' of the endpoint
+        and optionally the HTTP 'method' (GET by default), the 'params' of the
+        querystring and the 'body' of the POST requests. Please visit
+        https://developers.facebook.com/docs/graph-api/making-multiple-requests
+        for a detailed reference of the batch requests.
+
+        The requests are authenticated with the given access token, the
+        client's access token or the app access token, in that order.
+
+        Return a list with a tuple for each request, where the first element
+        is a boolean that tells whether the request succeeded or not and the
+        second element is the parsed response or the error returned by
+        Facebook for that request.
+        """
+        oauth_data = getattr(self, '_oauth_data', None) or {}
+        access_token = (access_token or oauth_data.get('access_token') or
+                        self.get_app_access_token())
+        results = []
+
+        for start in range(0, len(requests), self.batch_size):
+            chunk = requests[start:start + self.batch_size]
+            data = {
+                'access_token': access_token,
+                'include_headers': 'false',
+                'batch': json.dumps([
+                    self.compose_batch_request(request) for request in chunk
+                ])
+            }
+
+            r = self._post(self.service_api_url, data=data).json()
+
+            # The whole batch was rejected.
+            if isinstance(r, dict):
+                results.extend([(False, r.get('error', r))] * len(chunk))
+                continue
+
+            for item in r:
+                # Facebook returns null for the requests that did not
+                # complete in time.
+                if item is None:
+                    results.append((False, None))
+                    continue
+
+                body = self.parse_response(item.get('body') or '{}')
+
+                if 200 <= item['code'] < 300:
+                    results.append((True, body))
+
+                else:
+                    results.append((False, body.get('error', body)))
+
+        return results
+
+    def get_page_items(self, data, items_label='data'):
+        """
+        Returns the list of items of a graph API page, found under the 'data'
+        key unless other key is given.
+        """
+        return super(FacebookClient, self).get_page_items(
+            data, items_label or 'data')
+
+    def get_next_page(self, response, data, url, params):
+        """
+        Returns the url of the next page given by the graph API cursors, the
+        url already contains all the required parameters.
+        """
+        next_url = data.get('paging', {}).get('next')
+
+        return (next_url, {}) if next_url else None
+
     def retrieve_user_data(self):
         """
         Return the available data of the user from Facebook.
@@ -81,3 +272,9 @@ class FacebookClient(OAuth2Client):
         fields = ','.join(['first_name', 'last_name', 'email'])
 
         return self.get('me', params={'fields': fields})
+
+
+class AsyncFacebookClient(AsyncOAuth2Client, FacebookClient):
+    """
+    Client to connect asynchronously to the Facebook graph API.
+    """
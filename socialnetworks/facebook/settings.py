@@ -18,6 +18,8 @@ else:
     APP_ID = FACEBOOK.get('APP_ID', None)
     APP_SECRET = FACEBOOK.get('APP_SECRET', None)
     APP_ACCESS_TOKEN = FACEBOOK.get('APP_ACCESS_TOKEN', None)
+    APP_ACCESS_TOKEN_TTL = FACEBOOK.get('APP_ACCESS_TOKEN_TTL', 3600)
+    APP_ACCESS_TOKEN_OFFLINE = FACEBOOK.get('APP_ACCESS_TOKEN_OFFLINE', False)
     SCOPE = ','.join(FACEBOOK.get('SCOPE', ['email']))
     SESSION_KEY = FACEBOOK.get('SESSION_KEY', 'dsnfb')
     SESSION_FIELDS = ','.join(FACEBOOK.get('SESSION_FIELDS', []))
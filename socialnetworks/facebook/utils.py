@@ -1,10 +1,11 @@
+from .clients import FacebookClient
 from .settings import SESSION_KEY
-from ..core.utils import read_social_data
+from ..core.storage import get_storage
 
 
 def read_facebook_data(request):
     """
     Returns the current user's Facebook data if it was previously fetched
-    and stored in the user's session or cookies, otherwise returns None.
+    and stored in the configured storage, otherwise returns None.
     """
-    return read_social_data(request, SESSION_KEY)
+    return get_storage(FacebookClient, SESSION_KEY).get(request)
@@ -1,3 +1,3 @@
-from .clients import GitHubClient
+from .clients import AsyncGitHubClient, GitHubClient
 from .decorators import fetch_github_data
 from .utils import read_github_data
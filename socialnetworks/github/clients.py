@@ -1,8 +1,10 @@
 import uuid
 
+from urlparse import urlparse
+
 from . import settings
 from .models import GitHubOAuthProfile
-from ..core.clients import OAuth2Client
+from ..core.clients import AsyncOAuth2Client, OAuth2Client
 
 
 class GitHubClient(OAuth2Client):
@@ -16,6 +18,7 @@ class GitHubClient(OAuth2Client):
     app_access_token = settings.APP_ACCESS_TOKEN
     scope = settings.SCOPE
     model = GitHubOAuthProfile
+    configuration = settings.GITHUB
 
     uid_label = 'id'
     expiration_label = 'expires'
@@ -26,7 +29,7 @@ class GitHubClient(OAuth2Client):
     service_api_url = 'https://api.github.com/'
     session_key = 'socialnetworks:github'
 
-    def compose_authorization_url(self, callback_url):
+    def compose_authorization_url(self, callback_url, state=None):
         """
         Return the url to request user authorization at GitHub.
         """
@@ -34,11 +37,30 @@ class GitHubClient(OAuth2Client):
             'client_id': self.app_key,
             'redirect_uri': callback_url,
             'scope': self.scope,
-            'state': uuid.uuid4()
+            'state': state or uuid.uuid4()
         }
 
         return self.encode_url(self.authorization_url, params)
 
+    def get_rate_limit_resource(self, url, response=None):
+        """
+        Returns the GitHub resource whose quota is consumed by a request to
+        the given url, as reported by the response when available.
+        """
+        if response is not None and response.headers.get(
+                'X-RateLimit-Resource'):
+            return response.headers['X-RateLimit-Resource']
+
+        path = urlparse(url).path
+
+        if path.startswith('/search/'):
+            return 'search'
+
+        if path.startswith('/graphql'):
+            return 'graphql'
+
+        return 'core'
+
     def debug_access_token(self, token=None):
         """
         Check if the given access token is yet valid.
@@ -50,7 +72,14 @@ class GitHubClient(OAuth2Client):
         if token is None:
             token = self._oauth_data['access_token']
 
-        r = self.get(self.token_debug_url, auth_params={'access_token': token})
+        auth = self.compose_auth({
+            'access_token': token,
+            'token_type': 'bearer'
+        })
+        r = self._get(
+            self.service_api_url + self.token_debug_url, auth=auth,
+            rate_limit=False
+        ).json()
 
         return (False if 'message' in r else True, r)
 
@@ -76,3 +105,9 @@ class GitHubClient(OAuth2Client):
             'last_name': last_name,
             'email': r['email']
         }
+
+
+class AsyncGitHubClient(AsyncOAuth2Client, GitHubClient):
+    """
+    Client to connect asynchronously to the GitHub REST API.
+    """
@@ -1,10 +1,11 @@
+from .clients import GitHubClient
 from .settings import SESSION_KEY
-from ..core.utils import read_social_data
+from ..core.storage import get_storage
 
 
 def read_github_data(request):
     """
     Returns the current user's GitHub data if it was previously fetched
-    and stored in the user's session or cookies, otherwise returns None.
+    and stored in the configured storage, otherwise returns None.
     """
-    return read_social_data(request, SESSION_KEY)
+    return get_storage(GitHubClient, SESSION_KEY).get(request)
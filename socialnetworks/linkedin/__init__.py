@@ -1,3 +1,3 @@
-from .clients import LinkedInClient
+from .clients import AsyncLinkedInClient, LinkedInClient
 from .decorators import fetch_linkedin_data
 from .utils import read_linkedin_data
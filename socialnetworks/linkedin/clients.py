@@ -2,7 +2,7 @@ import uuid
 
 from . import settings
 from .models import LinkedInOAuthProfile
-from ..core.clients import OAuth2Client
+from ..core.clients import AsyncOAuth2Client, OAuth2Client
 
 
 class LinkedInClient(OAuth2Client):
@@ -14,6 +14,7 @@ class LinkedInClient(OAuth2Client):
     app_key = settings.APP_ID
     app_secret = settings.APP_SECRET
     model = LinkedInOAuthProfile
+    configuration = settings.LINKEDIN
 
     uid_label = 'id'
     expiration_label = 'expires_in'
@@ -24,7 +25,7 @@ class LinkedInClient(OAuth2Client):
     token_debug_url = 'people/~:(id)'
     session_key = 'socialnetworks:linkedin'
 
-    def compose_authorization_url(self, callback_url):
+    def compose_authorization_url(self, callback_url, state=None):
         """
         Return the url to request user authorization at LinkedIn.
         """
@@ -33,7 +34,7 @@ class LinkedInClient(OAuth2Client):
             'redirect_uri': callback_url,
             'response_type': 'code',
             'scope': self.scope,
-            'state': uuid.uuid4(),
+            'state': state or uuid.uuid4(),
         }
 
         return self.encode_url(self.authorization_url, params)
@@ -56,7 +57,7 @@ class LinkedInClient(OAuth2Client):
         params.update(self.get_auth_params(token))
         url = self.service_api_url + api_endpoint
 
-        return self._get(url, params=params).json()
+        return self._cached_get(api_endpoint, url, params=params).json()
 
     def post(self, api_endpoint, data=None, params={}, token=None):
         """
@@ -67,6 +68,37 @@ class LinkedInClient(OAuth2Client):
 
         return self._post(url, data=data, params=params).json()
 
+    def get_page(self, url, params={}):
+        """
+        Method to perform the request of a single page of a LinkedIn
+        collection.
+        """
+        params = dict(params, **self.get_auth_params())
+
+        return self._get(url, params=params)
+
+    def get_page_items(self, data, items_label='values'):
+        """
+        Returns the list of items of a LinkedIn collection, found under the
+        'values' key unless other key is given.
+        """
+        return super(LinkedInClient, self).get_page_items(
+            data, items_label or 'values')
+
+    def get_next_page(self, response, data, url, params):
+        """
+        Returns the parameters to request the next page of a LinkedIn
+        collection, or None if all the collection was already fetched.
+        """
+        start = data.get('_start', 0)
+        count = data.get('_count', len(data.get('values', [])))
+        total = data.get('_total', 0)
+
+        if count and start + count < total:
+            return (url, dict(params, start=start + count, count=count))
+
+        return None
+
     def debug_access_token(self, token=None):
         """
         Check if the given access token is yet valid.
@@ -78,7 +110,10 @@ class LinkedInClient(OAuth2Client):
         if token is None:
             token = self._oauth_data['access_token']
 
-        r = self.get(self.token_debug_url, token=token)
+        r = self._get(
+            self.service_api_url + self.token_debug_url,
+            params=self.get_auth_params(token), rate_limit=False
+        ).json()
 
         return (False if 'errorCode' in r else True, r)
 
@@ -97,3 +132,9 @@ class LinkedInClient(OAuth2Client):
             'last_name': r['lastName'],
             'email': r['emailAddress'],
         }
+
+
+class AsyncLinkedInClient(AsyncOAuth2Client, LinkedInClient):
+    """
+    Client to connect asynchronously to the LinkedIn REST API.
+    """
@@ -0,0 +1,68 @@
+import time
+
+from optparse import make_option
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from ...core.utils import atomic, normalize_email
+from ...models import NormalizedEmail
+
+
+class Command(BaseCommand):
+    help = ('Fills the table of normalized emails used to match the users by '
+            'their email address.')
+
+    option_list = BaseCommand.option_list + (
+        make_option(
+            '--batch-size', type='int', default=1000,
+            help='Number of users loaded and written at a time.'
+        ),
+    )
+
+    def handle(self, *args, **options):
+        UserModel = get_user_model()
+        batch_size = options['batch_size']
+        queryset = UserModel.objects.order_by('pk').values_list('pk', 'email')
+        stats = {'created': 0, 'updated': 0}
+        last_pk = None
+        start = time.time()
+
+        while True:
+            batch = queryset
+
+            if last_pk is not None:
+                batch = batch.filter(pk__gt=last_pk)
+
+            rows = list(batch[:batch_size])
+
+            if not rows:
+                break
+
+            last_pk = rows[-1][0]
+            stored = dict(NormalizedEmail.objects.filter(
+                user__in=[pk for pk, email in rows]
+            ).values_list('user', 'email'))
+            created = []
+
+            # Writes the normalized emails of the whole batch in a single
+            # transaction, only the missing or outdated ones are written.
+            with atomic():
+                for pk, email in rows:
+                    email = normalize_email(email)
+
+                    if pk not in stored:
+                        created.append(
+                            NormalizedEmail(user_id=pk, email=email))
+
+                    elif stored[pk] != email:
+                        NormalizedEmail.objects.filter(user=pk).update(
+                            email=email)
+                        stats['updated'] += 1
+
+                NormalizedEmail.objects.bulk_create(created)
+
+            stats['created'] += len(created)
+
+        self.stdout.write('%d created, %d updated in %.2fs.' % (
+            stats['created'], stats['updated'], time.time() - start))
@@ -0,0 +1,181 @@
+import threading
+import time
+
+from datetime import timedelta
+from optparse import make_option
+
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from ...core.clients import BaseOAuthClient
+from ...core.utils import atomic, get_client_classes
+
+
+def can_refresh(client_class):
+    """
+    Returns True if the given client class implements the refresh of the
+    access tokens.
+    """
+    method = client_class.refresh_access_token
+    base_method = BaseOAuthClient.refresh_access_token
+
+    return (getattr(method, '__func__', method) is not
+            getattr(base_method, '__func__', base_method))
+
+
+class Command(BaseCommand):
+    help = ('Refreshes the OAuth access tokens of the social profiles that '
+            'expire within the given horizon.')
+
+    option_list = BaseCommand.option_list + (
+        make_option(
+            '--horizon', type='int', default=3600,
+            help='Refresh the tokens that expire within the given seconds.'
+        ),
+        make_option(
+            '--workers', type='int', default=16,
+            help='Max number of tokens refreshed at the same time.'
+        ),
+        make_option(
+            '--service-workers', type='int', default=4,
+            help='Max number of tokens of a service refreshed at the '
+                 'same time.'
+        ),
+        make_option(
+            '--batch-size', type='int', default=200,
+            help='Number of profiles loaded and written at a time.'
+        ),
+        make_option(
+            '--service', action='append', dest='services', default=[],
+            help='Refresh only the tokens of the given service app label '
+                 '(ie, facebook), can be passed several times.'
+        ),
+    )
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.slots = threading.BoundedSemaphore(options['workers'])
+        self.output_lock = threading.Lock()
+
+        client_classes = []
+
+        for client_class in get_client_classes():
+            name = client_class.model._meta.app_label
+
+            if options['services'] and name not in options['services']:
+                continue
+
+            if client_class.oauth_version != 2 or not can_refresh(
+                    client_class):
+                self.log('%s: skipped, its tokens can not be refreshed.' %
+                         client_class.service_name)
+                continue
+
+            client_classes.append(client_class)
+
+        if not client_classes:
+            return
+
+        start = time.time()
+
+        with ThreadPoolExecutor(max_workers=len(client_classes)) as executor:
+            stats = list(executor.map(self.refresh_service, client_classes))
+
+        elapsed = time.time() - start
+        refreshed = sum(s['refreshed'] for s in stats)
+        failed = sum(s['failed'] for s in stats)
+
+        self.log('Total: %d refreshed, %d failed in %.2fs (%.2f tokens/s).' % (
+            refreshed, failed, elapsed,
+            (refreshed + failed) / elapsed if elapsed else 0))
+
+    def log(self, message):
+        with self.output_lock:
+            self.stdout.write(message)
+
+    def get_queryset(self, client_class):
+        """
+        Returns the profiles of the given service whose tokens expire within
+        the horizon and can be refreshed.
+        """
+        expires_before = timezone.now() + timedelta(
+            seconds=self.options['horizon'])
+
+        return client_class.model.objects.filter(
+            oauth_access_token_expires_at__lte=expires_before
+        ).exclude(
+            Q(oauth_refresh_token__isnull=True) | Q(oauth_refresh_token='')
+        ).order_by('pk')
+
+    def refresh_profile(self, client_class, profile):
+        """
+        Refreshes the token of the given profile and returns the fields to
+        update, or None if the refresh failed.
+        """
+        with self.slots:
+            try:
+                client = client_class(profile)
+                success, data = client.refresh_access_token(update=False)
+
+            except Exception as e:
+                self.log('%s: profile %s failed, %s' % (
+                    client_class.service_name, profile.pk, e))
+                return None
+
+        return client.get_token_fields(data) if success else None
+
+    def refresh_service(self, client_class):
+        """
+        Refreshes the tokens of the given service in batches and returns the
+        stats of the process.
+        """
+        stats = {'refreshed': 0, 'failed': 0}
+        queryset = self.get_queryset(client_class)
+        batch_size = self.options['batch_size']
+        last_pk = None
+        start = time.time()
+
+        with ThreadPoolExecutor(
+                max_workers=self.options['service_workers']) as executor:
+            while True:
+                batch = queryset
+
+                if last_pk is not None:
+                    batch = batch.filter(pk__gt=last_pk)
+
+                profiles = list(batch[:batch_size])
+
+                if not profiles:
+                    break
+
+                last_pk = profiles[-1].pk
+                results = executor.map(
+                    lambda p: self.refresh_profile(client_class, p), profiles)
+                updates = []
+
+                for profile, fields in zip(profiles, results):
+                    if fields:
+                        updates.append((profile.pk, fields))
+                    else:
+                        stats['failed'] += 1
+
+                # Writes the refreshed tokens of the whole batch in a single
+                # transaction.
+                with atomic():
+                    for pk, fields in updates:
+                        client_class.model.objects.filter(pk=pk).update(
+                            **fields)
+
+                stats['refreshed'] += len(updates)
+
+        elapsed = time.time() - start
+        total = stats['refreshed'] + stats['failed']
+
+        self.log('%s: %d refreshed, %d failed in %.2fs (%.2f tokens/s).' % (
+            client_class.service_name, stats['refreshed'], stats['failed'],
+            elapsed, total / elapsed if elapsed else 0))
+
+        return stats
@@ -0,0 +1,225 @@
+import json
+import os
+import time
+
+from optparse import make_option
+
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from ...core.utils import atomic, get_client_classes
+from ...models import TokenAudit
+
+
+class Command(BaseCommand):
+    help = ('Validates the OAuth access tokens of all the social profiles and '
+            'stores the result of each profile in the token audits.')
+
+    option_list = BaseCommand.option_list + (
+        make_option(
+            '--workers', type='int', default=16,
+            help='Max number of validation requests performed at the '
+                 'same time.'
+        ),
+        make_option(
+            '--batch-size', type='int', default=500,
+            help='Number of profiles loaded and written at a time.'
+        ),
+        make_option(
+            '--checkpoint', default=None,
+            help='Path of the file where the progress is stored, the audit '
+                 'resumes from this file if it exists. Remove the file to '
+                 'start a new audit.'
+        ),
+        make_option(
+            '--service', action='append', dest='services', default=[],
+            help='Validate only the tokens of the given service app label '
+                 '(ie, facebook), can be passed several times.'
+        ),
+    )
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.checkpoint = self.load_checkpoint()
+
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            for client_class in get_client_classes():
+                label = client_class.model._meta.app_label
+
+                if options['services'] and label not in options['services']:
+                    continue
+
+                self.validate_service(executor, client_class)
+
+    def load_checkpoint(self):
+        """
+        Returns the last validated primary key of each service stored in the
+        checkpoint file.
+        """
+        path = self.options['checkpoint']
+
+        if path and os.path.exists(path):
+            with open(path) as checkpoint:
+                return json.load(checkpoint)
+
+        return {}
+
+    def save_checkpoint(self):
+        """
+        Stores the last validated primary key of each service in the
+        checkpoint file, replacing it atomically.
+        """
+        path = self.options['checkpoint']
+
+        if path:
+            with open(path + '.tmp', 'w') as checkpoint:
+                json.dump(self.checkpoint, checkpoint)
+
+            os.rename(path + '.tmp', path)
+
+    def get_oauth_data(self, client_class, row):
+        """
+        Returns the OAuth data to initialize a client from the given row.
+        """
+        return {
+            'access_token': row[1],
+            'token_secret': row[2] if client_class.oauth_version == 1 else None
+        }
+
+    def validate_tokens(self, client_class, rows):
+        """
+        Validates the tokens of the given rows with a single batch request,
+        returns a list of the validity of each token, or None for the tokens
+        whose validation failed.
+        """
+        tokens = [row[1] for row in rows]
+
+        return [valid for valid, data in
+                client_class().debug_access_tokens(tokens)]
+
+    def validate_token(self, client_class, row):
+        """
+        Validates the token of the given row, returns its validity.
+        """
+        oauth_data = self.get_oauth_data(client_class, row)
+        client = client_class(oauth_data=oauth_data)
+
+        try:
+            return bool(client.debug_access_token()[0])
+
+        except Exception:
+            return None
+
+    def validate_batch(self, executor, client_class, rows):
+        """
+        Validates concurrently the tokens of the given rows and returns a list
+        of the validity of each token, or None for the tokens that could not
+        be validated.
+        """
+        # Validates up to 50 tokens per request when the service supports
+        # batch requests.
+        if hasattr(client_class, 'debug_access_tokens'):
+            size = client_class.batch_size
+            groups = [rows[i:i + size] for i in range(0, len(rows), size)]
+            futures = [
+                executor.submit(self.validate_tokens, client_class, group)
+                for group in groups
+            ]
+            results = []
+
+            for group, future in zip(groups, futures):
+                try:
+                    results.extend(future.result())
+
+                except Exception:
+                    results.extend([None] * len(group))
+
+            return results
+
+        return list(executor.map(
+            lambda row: self.validate_token(client_class, row), rows))
+
+    def save_results(self, label, pks, checked_at):
+        """
+        Stores the validity of the tokens of the service's profiles, whose
+        primary keys are given grouped by validity. The profiles whose token
+        could not be validated keep their last result.
+        """
+        audits = TokenAudit.objects.filter(service=label)
+        checked = pks[True] + pks[False]
+
+        if not checked:
+            return
+
+        with atomic():
+            existing = set(audits.filter(
+                profile_id__in=checked
+            ).values_list('profile_id', flat=True))
+
+            # Writes the valid and the invalid tokens with an update each and
+            # inserts the results of the profiles audited for the first time.
+            for valid in (True, False):
+                if pks[valid]:
+                    audits.filter(profile_id__in=pks[valid]).update(
+                        valid=valid, checked_at=checked_at)
+
+            TokenAudit.objects.bulk_create([
+                TokenAudit(service=label, profile_id=pk, valid=valid,
+                           checked_at=checked_at)
+                for valid in (True, False) for pk in pks[valid]
+                if pk not in existing
+            ])
+
+    def validate_service(self, executor, client_class):
+        """
+        Validates the tokens of all the profiles of the given service in
+        batches, resuming from the checkpoint.
+        """
+        model = client_class.model
+        label = model._meta.app_label
+        fields = ['pk', 'oauth_access_token']
+        batch_size = self.options['batch_size']
+        stats = {True: 0, False: 0, None: 0}
+        start = time.time()
+
+        if client_class.oauth_version == 1:
+            fields.append('oauth_access_token_secret')
+
+        queryset = model.objects.filter(
+            oauth_access_token__isnull=False
+        ).order_by('pk').values_list(*fields)
+
+        while True:
+            batch = queryset
+
+            if self.checkpoint.get(label) is not None:
+                batch = batch.filter(pk__gt=self.checkpoint[label])
+
+            rows = list(batch[:batch_size])
+
+            if not rows:
+                break
+
+            results = self.validate_batch(executor, client_class, rows)
+            checked_at = timezone.now()
+            pks = {True: [], False: [], None: []}
+
+            for row, valid in zip(rows, results):
+                stats[valid] += 1
+                pks[valid].append(row[0])
+
+            self.save_results(label, pks, checked_at)
+
+            self.checkpoint[label] = rows[-1][0]
+            self.save_checkpoint()
+
+        elapsed = time.time() - start
+        total = sum(stats.values())
+
+        self.stdout.write(
+            '%s: %d valid, %d invalid, %d errors in %.2fs (%.2f tokens/s).' % (
+                client_class.service_name, stats[True], stats[False],
+                stats[None], elapsed, total / elapsed if elapsed else 0)
+        )
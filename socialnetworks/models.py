@@ -1 +1,89 @@
+import django
 
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import models
+from django.db.models.signals import post_save
+from django.utils.translation import ugettext_lazy as _
+
+from .core.settings import NORMALIZED_EMAIL_LOOKUP
+from .core.utils import normalize_email
+
+
+class NormalizedEmail(models.Model):
+    """
+    Model that stores the trimmed and lowercased email address of each user
+    in an indexed column, used to match the users by their email.
+    """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        primary_key=True,
+        related_name='normalized_email',
+        verbose_name=_('user')
+    )
+    email = models.CharField(
+        max_length=254,
+        db_index=True,
+        verbose_name=_('email')
+    )
+
+    class Meta:
+        verbose_name = _('normalized email')
+        verbose_name_plural = _('normalized emails')
+
+
+class TokenAudit(models.Model):
+    """
+    Model that stores the result of the last validation of the access token
+    of a social profile, filled by the validate_social_tokens command.
+    """
+    service = models.CharField(
+        max_length=50,
+        verbose_name=_('service')
+    )
+    profile_id = models.PositiveIntegerField(
+        verbose_name=_('profile id')
+    )
+    valid = models.NullBooleanField(
+        verbose_name=_('OAuth token is valid')
+    )
+    checked_at = models.DateTimeField(
+        verbose_name=_('OAuth token checked at')
+    )
+
+    class Meta:
+        unique_together = ('service', 'profile_id')
+        verbose_name = _('token audit')
+        verbose_name_plural = _('token audits')
+
+
+def update_normalized_email(sender, instance, raw=False, **kwargs):
+    """
+    Keeps the normalized email of the saved user up to date, connected to
+    the post_save signal of the user model only if NORMALIZED_EMAIL_LOOKUP
+    is enabled.
+    """
+    if raw:
+        return
+
+    # Skips the partial saves that do not change the email, ie, the update of
+    # the last login of the user on every login.
+    update_fields = kwargs.get('update_fields')
+
+    if update_fields is not None and 'email' not in update_fields:
+        return
+
+    email = normalize_email(instance.email)
+
+    if not NormalizedEmail.objects.filter(user=instance).update(email=email):
+        NormalizedEmail.objects.create(user=instance, email=email)
+
+
+if NORMALIZED_EMAIL_LOOKUP:
+    # Django < 1.7 does not accept the label of the model as the sender.
+    post_save.connect(
+        update_normalized_email,
+        sender=(settings.AUTH_USER_MODEL if django.VERSION >= (1, 7)
+                else get_user_model()),
+        dispatch_uid='socialnetworks.update_normalized_email'
+    )
@@ -1,3 +1,3 @@
-from .clients import MovesAppClient
+from .clients import AsyncMovesAppClient, MovesAppClient
 from .decorators import fetch_moves_app_data
 from .utils import read_moves_app_data
@@ -1,10 +1,6 @@
-from datetime import timedelta
-
-from django.utils.timezone import now
-
 from . import settings
 from .models import MovesAppOAuthProfile
-from ..core.clients import OAuth2Client
+from ..core.clients import AsyncOAuth2Client, OAuth2Client
 
 
 class MovesAppClient(OAuth2Client):
@@ -16,6 +12,7 @@ class MovesAppClient(OAuth2Client):
     app_secret = settings.APP_SECRET
     scope = settings.SCOPE
     model = MovesAppOAuthProfile
+    configuration = settings.MOVES_APP
 
     expiration_label = 'expires_in'
     authorization_url = 'https://api.moves-app.com/oauth/v1/authorize'
@@ -25,7 +22,7 @@ class MovesAppClient(OAuth2Client):
     service_api_url = 'https://api.moves-app.com/api/1.1/'
     session_key = 'socialnetworks:moves-app'
 
-    def compose_authorization_url(self, callback_url):
+    def compose_authorization_url(self, callback_url, state=None):
         """
         Return the url to request user authorization at Moves app.
         """
@@ -36,6 +33,9 @@ class MovesAppClient(OAuth2Client):
             'scope': self.scope,
         }
 
+        if state is not None:
+            params['state'] = state
+
         return self.encode_url(self.authorization_url, params)
 
     def debug_access_token(self, token=None):
@@ -51,47 +51,13 @@ class MovesAppClient(OAuth2Client):
 
         params = {'access_token': token}
 
-        response = self._get(self.token_debug_url, params=params)
+        response = self._get(
+            self.token_debug_url, params=params, rate_limit=False)
 
         return (response.status_code == 200, response.json())
 
-    def refresh_access_token(self, update=True):
-        """
-        Perform a request to the Moves app API to refresh the access token for
-        the given profile.
-
-        Return a tuple of two objects where the first element is a boolean
-        telling whether the refresh request was successfull and the secons
-        element is the data returned by the Moves app API.
 
-        To call this method, client instances must be initialized with a
-        proper ```MovesAppOAuthProfile``` instance.
-
-        Pass update=True to force the profile instance to be updated with the
-        retrieved data.
-        """
-        assert isinstance(self._profile, self.model)
-
-        params = {
-            'grant_type': 'refresh_token',
-            'refresh_token': self._profile.oauth_refresh_token,
-            'client_id': self.app_key,
-            'client_secret': self.app_secret
-        }
-
-        response = self._post(self.refresh_token_url, params=params)
-        response_data = response.json()
-
-        if update and response.status_code == 200:
-            self._profile.oauth_access_token = response_data.get(
-                self.access_token_label)
-
-            self._profile.oauth_refresh_token = response_data.get(
-                self.refresh_token_label)
-
-            self._profile.oauth_token_expires_at = now() + timedelta(
-                seconds=int(response_data.get(self.expiration_label)))
-
-            self._profile.save()
-
-        return (response.status_code == 200, response.json())
+class AsyncMovesAppClient(AsyncOAuth2Client, MovesAppClient):
+    """
+    Client to connect asynchronously to the Moves app API.
+    """
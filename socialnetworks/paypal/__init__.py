@@ -1,3 +1,3 @@
-from .clients import PayPalClient
+from .clients import AsyncPayPalClient, PayPalClient
 from .decorators import fetch_paypal_data
 from .utils import read_paypal_data
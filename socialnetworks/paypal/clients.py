@@ -1,7 +1,7 @@
 from uuid import uuid4
 
 from . import settings
-from ..core.clients import OAuth2Client
+from ..core.clients import AsyncOAuth2Client, OAuth2Client
 from .models import PayPalOAuthProfile
 
 
@@ -16,6 +16,7 @@ class PayPalClient(OAuth2Client):
     app_access_token = settings.APP_ACCESS_TOKEN
     scope = settings.SCOPE
     model = PayPalOAuthProfile
+    configuration = settings.PAYPAL
 
     expiration_label = 'expires_in'
 
@@ -56,7 +57,7 @@ class PayPalClient(OAuth2Client):
         """
         return 'https://%s/v1/' % self.get_base_api_domain()
 
-    def compose_authorization_url(self, callback_url):
+    def compose_authorization_url(self, callback_url, state=None):
         """
         Return the url to request user authorization at PayPal.
         """
@@ -68,6 +69,9 @@ class PayPalClient(OAuth2Client):
             'nonce': uuid4()
         }
 
+        if state is not None:
+            params['state'] = state
+
         return self.encode_url(self.authorization_url, params)
 
     def debug_access_token(self, token=None):
@@ -82,7 +86,10 @@ class PayPalClient(OAuth2Client):
             token = self._oauth_data['access_token']
 
         auth = self.compose_auth({'access_token': token})
-        r = self.get(self.token_debug_url, auth=auth)
+        r = self._get(
+            self.service_api_url + self.token_debug_url, auth=auth,
+            rate_limit=False
+        ).json()
 
         return ('user_id' in r, r)
 
@@ -97,3 +104,9 @@ class PayPalClient(OAuth2Client):
             'last_name': r['family_name'],
             'email': r['email']
         }
+
+
+class AsyncPayPalClient(AsyncOAuth2Client, PayPalClient):
+    """
+    Client to connect asynchronously to the PayPal REST API.
+    """
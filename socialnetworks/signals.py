@@ -9,7 +9,7 @@ activation = Signal(providing_args=['user', 'service'])
 connect = Signal(providing_args=['user', 'service'])
 
 # Signal sent when a user disconnects its account from a social profile.
-disconnect = Signal(providing_args=['user', 'service'])
+disconnect = Signal(providing_args=['user', 'service', 'profile'])
 
 # Signal sent when a user logs in with a social profile.
 login = Signal(providing_args=['user', 'service'])
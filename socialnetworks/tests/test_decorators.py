@@ -0,0 +1,103 @@
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.backends.cache import SessionStore
+from django.http import HttpResponse
+from django.test import SimpleTestCase, TestCase
+from django.test.client import RequestFactory
+
+from ..core.decorators import DataFetcher
+from ..core.utils import get_social_profiles
+from ..facebook.clients import FacebookClient
+from ..facebook.models import FacebookOAuthProfile
+
+
+class StubClient(object):
+    """
+    Client whose access token is valid or not as told, it does not contact
+    the service.
+    """
+    service_name = 'stub'
+
+    def __init__(self, valid):
+        self.valid = valid
+
+    def get_setting(self, name):
+        return None
+
+    def check_access_token(self):
+        return self.valid, {'is_valid': self.valid}
+
+
+class DataFetcherTestCase(SimpleTestCase):
+    def setUp(self):
+        self.retrieved = []
+        self.fetcher = DataFetcher(
+            FacebookClient, 'stub', self.retrieve,
+            'socialnetworks:facebook:login'
+        )
+
+    def retrieve(self, client):
+        self.retrieved.append(client)
+
+        return {'id': '1'}
+
+    def test_fetch_with_valid_token(self):
+        client = StubClient(True)
+
+        self.assertEqual(self.fetcher.fetch(client), {'id': '1'})
+        self.assertEqual(self.retrieved, [client])
+
+    def test_fetch_with_invalid_token(self):
+        self.assertIsNone(self.fetcher.fetch(StubClient(False)))
+        self.assertEqual(self.retrieved, [])
+
+
+class ValidFacebookClient(FacebookClient):
+    """
+    Facebook client whose access token is always valid.
+    """
+    def check_access_token(self):
+        return True, {'is_valid': True}
+
+
+class DecoratedViewTestCase(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'user', 'user@example.com', 'password')
+        self.profile = FacebookOAuthProfile.objects.create(
+            service_uid='1', user=self.user, oauth_access_token='token')
+        self.fetcher = DataFetcher(
+            ValidFacebookClient, 'stub', lambda client: {'id': '1'},
+            'socialnetworks:facebook:login'
+        )
+
+    def get_request(self):
+        request = RequestFactory().get('/')
+        request.session = SessionStore()
+        request.user = self.user
+
+        return request
+
+    def view(self, request):
+        return HttpResponse(self.fetcher.get_storage(request).get(request))
+
+    def test_decorated_view(self):
+        response = self.fetcher.decorate(self.view)(self.get_request())
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b"{'id': '1'}")
+
+    def test_decorated_view_with_loaded_profiles(self):
+        request = self.get_request()
+        request.social_profiles = get_social_profiles(self.user)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                request.user.facebookoauthprofile, self.profile)
+            response = self.fetcher.decorate(self.view)(request)
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_profiles_are_indexed_by_model(self):
+        profiles = get_social_profiles(self.user)
+
+        self.assertEqual(profiles, {FacebookOAuthProfile: self.profile})
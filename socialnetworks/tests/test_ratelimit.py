@@ -0,0 +1,25 @@
+import time
+
+from django.test import SimpleTestCase
+
+from ..core.exceptions import RateLimitExceeded
+from ..core.ratelimit import RateLimiter
+from ..core.utils import get_cache
+
+
+class RateLimiterTestCase(SimpleTestCase):
+    def setUp(self):
+        self.cache = get_cache('default')
+        self.cache.clear()
+        self.limiter = RateLimiter('Twitter', self.cache, max_wait=0)
+        self.limiter.record(
+            'token', 0, time.time() + 60, '/1.1/search/tweets.json')
+
+    def test_exhausted_resource(self):
+        with self.assertRaises(RateLimitExceeded):
+            self.limiter.acquire(['token'], '/1.1/search/tweets.json')
+
+    def test_other_resources_are_not_held_back(self):
+        self.assertEqual(self.limiter.get_wait(
+            ['token'], '/1.1/account/verify_credentials.json'), 0)
+        self.limiter.acquire(['token'], '/1.1/statuses/home_timeline.json')
@@ -0,0 +1,25 @@
+import requests
+
+from django.test import SimpleTestCase
+
+from ..core.transport import create_session
+
+
+class CreateSessionTestCase(SimpleTestCase):
+    def setUp(self):
+        self.session = create_session()
+
+    def prepare(self, **kwargs):
+        return self.session.prepare_request(
+            requests.Request('GET', 'https://example.com/', **kwargs))
+
+    def test_cookies_are_not_kept(self):
+        self.session.cookies.set('sid', 'alice', domain='example.com')
+
+        self.assertEqual(len(self.session.cookies), 0)
+        self.assertNotIn('Cookie', self.prepare().headers)
+
+    def test_request_cookies_are_sent(self):
+        prepared = self.prepare(cookies={'sid': 'bob'})
+
+        self.assertEqual(prepared.headers['Cookie'], 'sid=bob')
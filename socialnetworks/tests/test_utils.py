@@ -0,0 +1,47 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from ..core import utils
+
+
+class ComposeUsernameTestCase(TestCase):
+    def setUp(self):
+        self.limits = []
+        self._randint = utils.randint
+        utils.randint = self.randint
+
+    def tearDown(self):
+        utils.randint = self._randint
+
+    def randint(self, a, b):
+        """
+        Returns consecutive numbers instead of random ones.
+        """
+        self.limits.append(b)
+
+        return len(self.limits)
+
+    def create_users(self, *numbers):
+        for number in numbers:
+            get_user_model().objects.create_user(
+                'JDoe%d' % number, 'jdoe%d@example.com' % number)
+
+    def test_skips_taken_candidates(self):
+        self.create_users(*range(1, utils.USERNAME_CANDIDATES))
+
+        with self.assertNumQueries(1):
+            username = utils.compose_username({'username': 'jdoe'})
+
+        self.assertEqual(username, 'jdoe%d' % utils.USERNAME_CANDIDATES)
+
+    def test_next_batch_when_all_candidates_are_taken(self):
+        self.create_users(*range(1, utils.USERNAME_CANDIDATES + 1))
+
+        with self.assertNumQueries(2):
+            username = utils.compose_username({'username': 'jdoe'})
+
+        size = utils.USERNAME_CANDIDATES
+        numbers = range(size + 1, 2 * size + 1)
+
+        self.assertEqual(self.limits, [9999] * size + [99999] * size)
+        self.assertIn(username, ['jdoe%d' % n for n in numbers])
@@ -0,0 +1,188 @@
+from urlparse import urlparse, parse_qs
+
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.backends.cache import SessionStore
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.client import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from ..facebook import views
+from ..facebook.models import FacebookOAuthProfile
+
+
+class StatelessDialogRedirect(views.FacebookDialogRedirect):
+    def is_stateless(self):
+        return True
+
+
+class StatelessCallback(views.FacebookCallback):
+    def is_stateless(self):
+        return True
+
+
+class StatelessFlowTestCase(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def start_flow(self):
+        """
+        Returns the state parameter and the response of the dialog view.
+        """
+        request = self.factory.post('/social/facebook/login/', {'next': '/'})
+        request.session = SessionStore()
+        response = StatelessDialogRedirect.as_view()(request)
+        query = parse_qs(urlparse(response['Location']).query)
+
+        return query['state'][0], response
+
+    def call_back(self, state, cookies=None):
+        request = self.factory.get(
+            '/social/facebook/callback/', {'code': 'code', 'state': state})
+        request.session = SessionStore()
+        request.COOKIES.update(cookies or {})
+
+        return StatelessCallback.as_view()(request)
+
+    def test_dialog_sets_the_nonce_cookie(self):
+        state, response = self.start_flow()
+        cookie = response.cookies['socialnetworks_facebook_state']
+
+        self.assertTrue(cookie.value)
+        self.assertTrue(cookie['httponly'])
+
+    def test_callback_without_the_nonce_cookie(self):
+        state, response = self.start_flow()
+
+        self.assertEqual(self.call_back(state).status_code, 403)
+
+    def test_callback_with_another_nonce_cookie(self):
+        state, response = self.start_flow()
+        cookies = {'socialnetworks_facebook_state': 'another-nonce'}
+
+        self.assertEqual(self.call_back(state, cookies).status_code, 403)
+
+
+class RacingQuerySet(object):
+    """
+    Queryset whose first lookup misses the profile, as if another request
+    created it meanwhile.
+    """
+    def __init__(self, queryset):
+        self.queryset = queryset
+        self.missed = False
+
+    def get(self, **kwargs):
+        if not self.missed:
+            self.missed = True
+            raise FacebookOAuthProfile.DoesNotExist
+
+        return self.queryset.get(**kwargs)
+
+
+class UpsertProfileTestCase(TestCase):
+    def setUp(self):
+        self.view = views.FacebookCallback()
+        self.user = get_user_model().objects.create_user(
+            'user', 'user@example.com', 'password')
+        self.data = {'oauth_access_token': 'token'}
+
+    def assertUpsertQueries(self, num, func, *args, **kwargs):
+        """
+        Asserts that the given function performs 'num' queries, ignoring
+        the savepoints of its atomic blocks, and returns its result.
+        """
+        with CaptureQueriesContext(connection) as context:
+            result = func(*args, **kwargs)
+
+        queries = [
+            query['sql'] for query in context.captured_queries
+            if 'SAVEPOINT' not in query['sql'].upper()
+        ]
+        self.assertEqual(len(queries), num, '\n'.join(queries))
+
+        return result
+
+    def test_new_profile(self):
+        profile, created, attached = self.assertUpsertQueries(
+            2, self.view.upsert_profile, '1', self.data)
+
+        self.assertTrue(created)
+        self.assertFalse(attached)
+        self.assertEqual(profile.oauth_access_token, 'token')
+
+    def test_new_profile_of_the_current_user(self):
+        profile, created, attached = self.assertUpsertQueries(
+            2, self.view.upsert_profile, '1', self.data, user=self.user)
+
+        self.assertTrue(created)
+        self.assertTrue(attached)
+        self.assertEqual(profile.user, self.user)
+
+    def test_returning_profile(self):
+        FacebookOAuthProfile.objects.create(service_uid='1', user=self.user)
+
+        profile, created, attached = self.assertUpsertQueries(
+            2, self.view.upsert_profile, '1', self.data)
+
+        self.assertFalse(created)
+        self.assertFalse(attached)
+        self.assertEqual(profile.user, self.user)
+        self.assertEqual(
+            FacebookOAuthProfile.objects.get(service_uid='1')
+            .oauth_access_token, 'token')
+
+    def test_connect_profile(self):
+        FacebookOAuthProfile.objects.create(service_uid='1')
+
+        profile, created, attached = self.assertUpsertQueries(
+            2, self.view.upsert_profile, '1', self.data, user=self.user)
+
+        self.assertFalse(created)
+        self.assertTrue(attached)
+        self.assertEqual(
+            FacebookOAuthProfile.objects.get(service_uid='1').user_id,
+            self.user.pk)
+
+    def test_only_login_without_profile(self):
+        result = self.assertUpsertQueries(
+            1, self.view.upsert_profile, '1', self.data, create=False)
+
+        self.assertEqual(result, (None, False, False))
+        self.assertFalse(FacebookOAuthProfile.objects.exists())
+
+    def test_profile_of_another_user(self):
+        other = get_user_model().objects.create_user(
+            'other', 'other@example.com', 'password')
+        FacebookOAuthProfile.objects.create(service_uid='1', user=other)
+
+        profile, created, attached = self.assertUpsertQueries(
+            2, self.view.upsert_profile, '1', self.data, user=self.user)
+
+        self.assertFalse(created)
+        self.assertFalse(attached)
+        self.assertEqual(profile.user, other)
+        self.assertEqual(
+            FacebookOAuthProfile.objects.get(service_uid='1').user_id,
+            other.pk)
+
+    def test_profile_created_concurrently(self):
+        FacebookOAuthProfile.objects.create(service_uid='1', user=self.user)
+        manager = FacebookOAuthProfile.objects
+        queryset = RacingQuerySet(manager.select_related('user'))
+        manager.select_related = lambda *fields: queryset
+
+        try:
+            # The insert fails, then the profile is fetched and updated.
+            profile, created, attached = self.assertUpsertQueries(
+                3, self.view.upsert_profile, '1', self.data)
+
+        finally:
+            del manager.select_related
+
+        self.assertFalse(created)
+        self.assertFalse(attached)
+        self.assertEqual(FacebookOAuthProfile.objects.count(), 1)
+        self.assertEqual(
+            FacebookOAuthProfile.objects.get(service_uid='1')
+            .oauth_access_token, 'token')
@@ -0,0 +1,8 @@
+from django.conf.urls import url, patterns, include
+
+
+urlpatterns = patterns(
+    '',
+    url(r'^social/',
+        include('socialnetworks.urls', namespace='socialnetworks')),
+)
@@ -1,3 +1,3 @@
-from .clients import TwitterClient
+from .clients import AsyncTwitterClient, TwitterClient
 from .decorators import fetch_twitter_data
 from .utils import read_twitter_data
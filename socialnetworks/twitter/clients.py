@@ -1,6 +1,6 @@
 from . import settings
 from .models import TwitterOAuthProfile
-from ..core.clients import OAuth1Client
+from ..core.clients import AsyncOAuth1Client, OAuth1Client
 
 
 class TwitterClient(OAuth1Client):
@@ -12,6 +12,7 @@ class TwitterClient(OAuth1Client):
     app_key = settings.APP_ID
     app_secret = settings.APP_SECRET
     model = TwitterOAuthProfile
+    configuration = settings.TWITTER
 
     service_api_url = 'https://api.twitter.com/1.1/'
     request_token_url = 'https://api.twitter.com/oauth/request_token'
@@ -36,7 +37,13 @@ class TwitterClient(OAuth1Client):
         that tells whether the token is valid or not and the second element is
         the data resulting of the token validation.
         """
-        r = self.get(self.token_debug_url)
+        # Validates the token against the service, bypassing the response
+        # cache so a revoked token is not taken for a valid one.
+        auth = self.compose_auth(self.get_auth_params())
+        r = self._get(
+            self.service_api_url + self.token_debug_url, auth=auth,
+            rate_limit=False
+        ).json()
 
         if 'errors' in r:
             return (False, r)
@@ -44,6 +51,34 @@ class TwitterClient(OAuth1Client):
         else:
             return (True, r)
 
+    def get_page_items(self, data, items_label=None):
+        """
+        Returns the list of items of a cursored page, if no key is given
+        the items are the first list found in the page (ie, 'ids', 'users'
+        or 'lists').
+        """
+        if items_label is None and isinstance(data, dict):
+            items = [v for v in data.values() if isinstance(v, list)]
+
+            return items[0] if items else []
+
+        return super(TwitterClient, self).get_page_items(data, items_label)
+
+    def get_next_page(self, response, data, url, params):
+        """
+        Returns the parameters to request the next page of a cursored
+        endpoint, Twitter returns a zero cursor in the last page.
+        """
+        if not isinstance(data, dict):
+            return None
+
+        cursor = data.get('next_cursor_str')
+
+        if cursor and cursor != '0':
+            return (url, dict(params, cursor=cursor))
+
+        return None
+
     def retrieve_user_data(self):
         """
         Return the available data of the user from Twitter.
@@ -65,3 +100,9 @@ class TwitterClient(OAuth1Client):
             'first_name': first_name,
             'last_name': last_name,
         }
+
+
+class AsyncTwitterClient(AsyncOAuth1Client, TwitterClient):
+    """
+    Client to connect asynchronously to the Twitter REST API.
+    """